@@ -13,6 +13,10 @@ from app.models.user import User
 from app.models.board import Board
 from app.models.list import List
 from app.models.task import Task
+from app.models.board_member import BoardMember
+from app.models.board_change import BoardChange
+from app.models.activity import Activity
+from app.models.outbox import OutboxMessage
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,68 @@
+"""Add ordered positions to lists and tasks
+
+Revision ID: 3b8e51c2d7a4
+Revises: ebac69c08913
+Create Date: 2026-10-18 09:12:44.102938
+
+"""
+from itertools import groupby
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e51c2d7a4'
+down_revision: Union[str, None] = 'ebac69c08913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same key layout as app.services.ordering.spaced_keys, frozen here so the
+# migration does not change if the application code does.
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+HEAD_WIDTH = 6
+HEAD_STEP = 36 ** 3
+HEAD_SPAN = 36 ** HEAD_WIDTH
+
+
+def _spaced_keys(count):
+    step = min(HEAD_STEP, HEAD_SPAN // (count + 1))
+    start = max(step, HEAD_SPAN // 2 - step * (count // 2))
+    keys = []
+    for index in range(count):
+        value, digits = start + step * index, []
+        for _ in range(HEAD_WIDTH):
+            value, digit = divmod(value, 36)
+            digits.append(DIGITS[digit])
+        keys.append("".join(reversed(digits)).rstrip("0"))
+    return keys
+
+
+def _backfill(table, parent):
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(f"SELECT id, {parent} FROM {table} ORDER BY {parent}, id")).all()
+    updates = []
+    for _, group in groupby(rows, key=lambda row: row[1]):
+        ids = [row[0] for row in group]
+        updates.extend({"id": id_, "position": key} for id_, key in zip(ids, _spaced_keys(len(ids))))
+    if updates:
+        bind.execute(sa.text(f"UPDATE {table} SET position = :position WHERE id = :id"), updates)
+
+
+def upgrade() -> None:
+    op.add_column('lists', sa.Column('position', sa.String(), nullable=True))
+    op.add_column('tasks', sa.Column('position', sa.String(), nullable=True))
+    _backfill('lists', 'board_id')
+    _backfill('tasks', 'list_id')
+    op.alter_column('lists', 'position', existing_type=sa.String(), nullable=False)
+    op.alter_column('tasks', 'position', existing_type=sa.String(), nullable=False)
+    op.create_index('ix_lists_board_id_position', 'lists', ['board_id', 'position'], unique=False)
+    op.create_index('ix_tasks_list_id_position', 'tasks', ['list_id', 'position'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_list_id_position', table_name='tasks')
+    op.drop_index('ix_lists_board_id_position', table_name='lists')
+    op.drop_column('tasks', 'position')
+    op.drop_column('lists', 'position')
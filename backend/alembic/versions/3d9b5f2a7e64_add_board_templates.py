@@ -0,0 +1,28 @@
+"""Add a template flag to boards
+
+Revision ID: 3d9b5f2a7e64
+Revises: c41e7b9a0d36
+Create Date: 2026-10-18 16:42:07.318254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d9b5f2a7e64'
+down_revision: Union[str, None] = 'c41e7b9a0d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('boards', sa.Column('is_template', sa.Boolean(), server_default='false', nullable=False))
+    op.create_index('ix_boards_is_template_id', 'boards', ['is_template', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_boards_is_template_id', table_name='boards')
+    op.drop_column('boards', 'is_template')
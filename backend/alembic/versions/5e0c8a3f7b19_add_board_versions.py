@@ -0,0 +1,26 @@
+"""Add a change version to boards
+
+Revision ID: 5e0c8a3f7b19
+Revises: d2b7f41c9e60
+Create Date: 2026-10-18 12:08:31.660492
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0c8a3f7b19'
+down_revision: Union[str, None] = 'd2b7f41c9e60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('boards', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('boards', 'version')
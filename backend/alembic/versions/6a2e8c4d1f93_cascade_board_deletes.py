@@ -0,0 +1,42 @@
+"""Cascade board deletes in the database and add soft deletion
+
+Revision ID: 6a2e8c4d1f93
+Revises: 3d9b5f2a7e64
+Create Date: 2026-10-18 17:26:44.905173
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a2e8c4d1f93'
+down_revision: Union[str, None] = '3d9b5f2a7e64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (constraint, table, column, referenced table) of each parent-child key.
+CASCADED = [
+    ('lists_board_id_fkey', 'lists', 'board_id', 'boards'),
+    ('tasks_list_id_fkey', 'tasks', 'list_id', 'lists'),
+    ('board_members_board_id_fkey', 'board_members', 'board_id', 'boards'),
+    ('board_user_association_board_id_fkey', 'board_user_association', 'board_id', 'boards'),
+]
+
+
+def upgrade() -> None:
+    for name, table, column, referred in CASCADED:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred, [column], ['id'], ondelete='CASCADE')
+    op.add_column('boards', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_boards_deleted_at', 'boards', ['deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_boards_deleted_at', table_name='boards')
+    op.drop_column('boards', 'deleted_at')
+    for name, table, column, referred in CASCADED:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred, [column], ['id'])
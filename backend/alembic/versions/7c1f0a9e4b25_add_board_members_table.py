@@ -0,0 +1,45 @@
+"""Add board_members table
+
+Revision ID: 7c1f0a9e4b25
+Revises: 3b8e51c2d7a4
+Create Date: 2026-10-18 10:03:17.551204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1f0a9e4b25'
+down_revision: Union[str, None] = '3b8e51c2d7a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('board_members',
+    sa.Column('board_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['board_id'], ['boards.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('board_id', 'user_id')
+    )
+    op.create_index('ix_board_members_user_id_board_id', 'board_members', ['user_id', 'board_id'], unique=False)
+    op.execute(
+        "INSERT INTO board_members (board_id, user_id, role) "
+        "SELECT id, owner_id, 'owner' FROM boards WHERE owner_id IS NOT NULL"
+    )
+    op.execute(
+        "INSERT INTO board_members (board_id, user_id, role) "
+        "SELECT DISTINCT a.board_id, a.user_id, 'editor' FROM board_user_association a "
+        "WHERE a.board_id IS NOT NULL AND a.user_id IS NOT NULL AND NOT EXISTS ("
+        "SELECT 1 FROM board_members m WHERE m.board_id = a.board_id AND m.user_id = a.user_id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_board_members_user_id_board_id', table_name='board_members')
+    op.drop_table('board_members')
@@ -0,0 +1,35 @@
+"""Add board_changes log table
+
+Revision ID: 8f3a6d1e2c57
+Revises: 5e0c8a3f7b19
+Create Date: 2026-10-18 12:47:19.208815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3a6d1e2c57'
+down_revision: Union[str, None] = '5e0c8a3f7b19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('board_changes',
+    sa.Column('board_id', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('board_id', 'seq')
+    )
+    op.create_index('ix_board_changes_created_at', 'board_changes', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_board_changes_created_at', table_name='board_changes')
+    op.drop_table('board_changes')
@@ -0,0 +1,41 @@
+"""Add month-partitioned activity table
+
+Revision ID: 9b4d7e1a3c58
+Revises: 6a2e8c4d1f93
+Create Date: 2026-10-18 19:02:37.516284
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4d7e1a3c58'
+down_revision: Union[str, None] = '6a2e8c4d1f93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('activity',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('board_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index('ix_activity_board_id_created_at', 'activity', ['board_id', 'created_at', 'id'], unique=False)
+    # Monthly partitions are created ahead by the app (services.activity);
+    # rows outside them land in the default one.
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE TABLE activity_default PARTITION OF activity DEFAULT')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_activity_board_id_created_at', table_name='activity')
+    op.drop_table('activity')
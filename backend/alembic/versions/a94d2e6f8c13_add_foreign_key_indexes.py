@@ -0,0 +1,43 @@
+"""Add foreign key indexes and a primary key to board_user_association
+
+Revision ID: a94d2e6f8c13
+Revises: 7c1f0a9e4b25
+Create Date: 2026-10-18 10:41:52.730166
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a94d2e6f8c13'
+down_revision: Union[str, None] = '7c1f0a9e4b25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# lists.board_id and tasks.list_id are already the leading columns of
+# ix_lists_board_id_position and ix_tasks_list_id_position, and
+# board_members is covered by its primary key plus (user_id, board_id).
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_boards_owner_id'), 'boards', ['owner_id'], unique=False)
+    op.execute("DELETE FROM board_user_association WHERE board_id IS NULL OR user_id IS NULL")
+    op.execute(
+        "DELETE FROM board_user_association a USING board_user_association b "
+        "WHERE a.board_id = b.board_id AND a.user_id = b.user_id AND a.ctid < b.ctid"
+    )
+    op.alter_column('board_user_association', 'board_id', existing_type=sa.Integer(), nullable=False)
+    op.alter_column('board_user_association', 'user_id', existing_type=sa.Integer(), nullable=False)
+    op.create_primary_key('board_user_association_pkey', 'board_user_association', ['board_id', 'user_id'])
+    op.create_index(op.f('ix_board_user_association_user_id'), 'board_user_association', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_board_user_association_user_id'), table_name='board_user_association')
+    op.drop_constraint('board_user_association_pkey', 'board_user_association', type_='primary')
+    op.alter_column('board_user_association', 'user_id', existing_type=sa.Integer(), nullable=True)
+    op.alter_column('board_user_association', 'board_id', existing_type=sa.Integer(), nullable=True)
+    op.drop_index(op.f('ix_boards_owner_id'), table_name='boards')
@@ -0,0 +1,43 @@
+"""Add full-text search vectors to boards, lists and tasks
+
+Revision ID: d2b7f41c9e60
+Revises: a94d2e6f8c13
+Create Date: 2026-10-18 11:26:08.415207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b7f41c9e60'
+down_revision: Union[str, None] = 'a94d2e6f8c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of app.models.search_index.search_vector_expression output.
+SEARCH_VECTORS = {
+    'boards': "setweight(to_tsvector('english', coalesce(title, '')), 'A')",
+    'lists': "setweight(to_tsvector('english', coalesce(title, '')), 'A')",
+    'tasks': (
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+    ),
+}
+
+
+def upgrade() -> None:
+    for table, expression in SEARCH_VECTORS.items():
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({expression}) STORED"
+        )
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    for table in reversed(list(SEARCH_VECTORS)):
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
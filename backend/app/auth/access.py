@@ -0,0 +1,92 @@
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import contains_eager
+from app.models.board import Board
+from app.models.board_member import BoardMember
+from app.models.list import List
+from app.models.task import Task
+
+OWNER = "owner"
+EDITOR = "editor"
+
+# Roles that satisfy a required role.
+GRANTED_BY = {
+    OWNER: (OWNER,),
+    EDITOR: (OWNER, EDITOR),
+}
+
+
+def membership(board_id_column, user, role=EDITOR):
+    """Join condition matching ``user``'s board_members row for ``board_id_column``.
+
+    The row is found by a primary-key probe on (board_id, user_id).
+    """
+    return and_(
+        BoardMember.board_id == board_id_column,
+        BoardMember.user_id == user.id,
+        BoardMember.role.in_(GRANTED_BY[role]),
+    )
+
+
+async def require_board_role(db, board_id, user, role=EDITOR):
+    granted = await db.scalar(select(BoardMember.role).where(membership(board_id, user, role)))
+    if granted is None:
+        raise HTTPException(status_code=404, detail="Board not found")
+    return granted
+
+
+async def get_board_version(db, board_id, user, role=EDITOR):
+    version = await db.scalar(
+        select(Board.version).join(BoardMember, membership(Board.id, user, role)).where(Board.id == board_id)
+    )
+    if version is None:
+        raise HTTPException(status_code=404, detail="Board not found")
+    return version
+
+
+async def get_board_for(db, board_id, user, role=EDITOR, options=()):
+    board = await db.scalar(
+        select(Board).join(BoardMember, membership(Board.id, user, role)).where(Board.id == board_id).options(*options)
+    )
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found")
+    return board
+
+
+async def get_clone_source(db, board_id, user):
+    """Returns the id of a board the user may copy: one of theirs, or any template."""
+    source_id = await db.scalar(
+        select(Board.id).outerjoin(BoardMember, membership(Board.id, user))
+        .where(Board.id == board_id, or_(and_(Board.is_template, Board.deleted_at.is_(None)), BoardMember.user_id.is_not(None)))
+    )
+    if source_id is None:
+        raise HTTPException(status_code=404, detail="Board not found")
+    return source_id
+
+
+async def get_list_for(db, list_id, user, role=EDITOR, detail="List not found"):
+    list_item = await db.scalar(select(List).join(BoardMember, membership(List.board_id, user, role)).where(List.id == list_id))
+    if not list_item:
+        raise HTTPException(status_code=404, detail=detail)
+    return list_item
+
+
+async def get_list_version(db, list_id, user, role=EDITOR):
+    """Returns (board_id, board version) for a list the user can access."""
+    row = (await db.execute(
+        select(List.board_id, Board.version).join(List.board).join(BoardMember, membership(List.board_id, user, role))
+        .where(List.id == list_id)
+    )).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="List not found")
+    return row
+
+
+async def get_task_for(db, task_id, user, role=EDITOR):
+    task = await db.scalar(
+        select(Task).join(List).join(BoardMember, membership(List.board_id, user, role)).where(Task.id == task_id)
+        .options(contains_eager(Task.list))
+    )
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
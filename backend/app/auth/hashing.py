@@ -0,0 +1,105 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import HTTPException, status
+from app.config import settings
+
+
+def _busy():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
+class HashingPool:
+    """Runs bcrypt work in a dedicated process pool.
+
+    At most ``max_pending`` calls may be queued or running at once; anything
+    beyond that is rejected immediately with a 503 instead of piling up.
+    """
+
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.restarts = 0
+        self._executor = None
+
+    def start(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _discard(self, executor):
+        # A worker that dies (OOM kill, segfault) breaks the whole executor;
+        # drop it so the next call starts a fresh one.
+        if self._executor is executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self.restarts += 1
+
+    async def warm(self):
+        """Starts every worker process and loads the bcrypt backend in it.
+
+        Spawned workers are started on demand, so the first logins would
+        otherwise wait for process start-up and the imports behind it.
+        """
+        from app.auth.utils import load_hash_backend
+        loop = asyncio.get_running_loop()
+        executor = self.start()
+        try:
+            await asyncio.gather(*(loop.run_in_executor(executor, load_hash_backend) for _ in range(self.workers)))
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise _busy()
+        executor = self.start()
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise _busy()
+        finally:
+            elapsed = time.perf_counter() - started
+            self.pending -= 1
+            self.completed += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+            "avg_seconds": self.total_seconds / self.completed if self.completed else 0.0,
+            "max_seconds": self.max_seconds,
+        }
+
+
+hashing_pool = HashingPool(settings.HASHING_WORKERS, settings.HASHING_MAX_PENDING)
@@ -2,9 +2,12 @@ from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.user import User
+from app.auth.principal_cache import principal_cache
+from app.services.board_changes import ACTOR_KEY
 import os
 
 SECRET_KEY = os.getenv("JWT_SECRET_KEY")
@@ -20,12 +23,16 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def verify_token(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    user = principal_cache.get(token)
+    if user is not None:
+        db.info[ACTOR_KEY] = user.id
+        return user
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -33,7 +40,11 @@ def verify_token(token: str = Depends(oauth2_scheme), db: Session = Depends(get_
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+    user = await db.scalar(select(User).where(User.email == email))
+    if user is None or user.is_active is False:
         raise credentials_exception
+    # Detach so the cached instance is never expired by another request's commit.
+    db.expunge(user)
+    principal_cache.set(token, user, payload.get("exp"))
+    db.info[ACTOR_KEY] = user.id
     return user
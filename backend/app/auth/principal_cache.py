@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from app.config import settings
+from app.models.user import User
+
+
+class PrincipalCache:
+    """Bounded TTL + LRU cache of authenticated users, keyed by bearer token.
+
+    Entries never outlive the token's own ``exp`` claim. Cached users are
+    detached from any session, so only their column attributes may be used.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._tokens_by_email = {}
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, user = entry
+            if expires_at <= now:
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return user
+
+    def set(self, token, user, token_exp=None):
+        ttl = self.ttl_seconds
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._remove(token)
+            self._entries[token] = (time.monotonic() + ttl, user)
+            self._tokens_by_email.setdefault(user.email, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, email):
+        with self._lock:
+            for token in list(self._tokens_by_email.get(email, ())):
+                self._remove(token)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_email.clear()
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, token):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        email = entry[1].email
+        tokens = self._tokens_by_email.get(email)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_email[email]
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+# Evictions wait for the commit: evicting at flush time would let a request
+# racing the transaction cache the old row again, or the change would be
+# evicted for nothing if it rolled back.
+PENDING_KEY = "principal_cache_evictions"
+
+
+def _evict_on_commit(target, emails):
+    object_session(target).info.setdefault(PENDING_KEY, set()).update(emails)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_changed_user(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in ("email", "hashed_password", "is_active")):
+        return
+    _evict_on_commit(target, [target.email, *state.attrs.email.history.deleted])
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target):
+    _evict_on_commit(target, [target.email])
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed(session):
+    for email in session.info.pop(PENDING_KEY, ()):
+        principal_cache.invalidate_user(email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,146 @@
+import importlib
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from fastapi import HTTPException, status
+from app.config import settings
+
+
+class RateLimitBackend(ABC):
+    """Token-bucket storage shared by every limiter.
+
+    The in-process backend limits each worker separately. A multi-worker
+    deployment plugs in a shared implementation (for example a Redis script
+    doing the same refill-and-take atomically) through RATE_LIMIT_BACKEND.
+    """
+
+    @abstractmethod
+    async def consume(self, key, capacity, refill_per_second, cost=1):
+        """Takes ``cost`` tokens from the bucket at ``key``.
+
+        Returns 0 when the tokens were taken, otherwise the number of
+        seconds until enough tokens will have refilled.
+        """
+
+    @abstractmethod
+    async def peek(self, key, capacity, refill_per_second):
+        """Like consume(), but only reports whether a token is available and takes none."""
+
+
+class MemoryBackend(RateLimitBackend):
+    """Buckets in a bounded LRU dict; an evicted bucket starts over full."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    def _tokens(self, key, capacity, refill_per_second, now):
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        return min(capacity, tokens + (now - updated) * refill_per_second)
+
+    async def peek(self, key, capacity, refill_per_second):
+        tokens = self._tokens(key, capacity, refill_per_second, time.monotonic())
+        return 0.0 if tokens >= 1 else (1 - tokens) / refill_per_second
+
+    async def consume(self, key, capacity, refill_per_second, cost=1):
+        now = time.monotonic()
+        tokens = self._tokens(key, capacity, refill_per_second, now)
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / refill_per_second
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+def load_backend(path):
+    """Builds the backend named by ``module:factory``, or an in-process one."""
+    if not path:
+        return MemoryBackend(settings.RATE_LIMIT_MAX_KEYS)
+    module, _, factory = path.partition(":")
+    return getattr(importlib.import_module(module), factory)()
+
+
+def client_ip(request):
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimit:
+    def __init__(self, capacity, per_minute):
+        self.capacity = capacity
+        self.refill_per_second = per_minute / 60
+
+
+class AuthRateLimiter:
+    """Throttles one auth endpoint per client IP and per account email.
+
+    Call check() before any database or bcrypt work, so a rejected request
+    costs a dictionary lookup rather than a hash. Every attempt takes from
+    the IP's bucket, but only failed ones, reported with failed(), take from
+    the email's: otherwise anyone could keep an account locked out by
+    trying its email now and then.
+    """
+
+    def __init__(self, scope, backend, by_ip, by_email):
+        self.scope = scope
+        self.backend = backend
+        self.by_ip = by_ip
+        self.by_email = by_email
+        self.allowed = 0
+        self.rejected = 0
+        self.failures = 0
+
+    def _email_key(self, email):
+        return f"{self.scope}:email:{email.strip().lower()}"
+
+    def _reject(self, wait):
+        self.rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts, please retry later",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+
+    async def check(self, request, email=None):
+        # The email's bucket is only looked at, and first, so a request it
+        # rejects spends nothing from the IP's.
+        if email:
+            wait = await self.backend.peek(self._email_key(email), self.by_email.capacity, self.by_email.refill_per_second)
+            if wait > 0:
+                self._reject(wait)
+        wait = await self.backend.consume(f"{self.scope}:ip:{client_ip(request)}", self.by_ip.capacity, self.by_ip.refill_per_second)
+        if wait > 0:
+            self._reject(wait)
+        self.allowed += 1
+
+    async def failed(self, email):
+        """Charges a failed attempt to the email's bucket."""
+        self.failures += 1
+        await self.backend.consume(self._email_key(email), self.by_email.capacity, self.by_email.refill_per_second)
+
+    def stats(self):
+        return {"allowed": self.allowed, "rejected": self.rejected, "failures": self.failures}
+
+
+rate_limit_backend = load_backend(settings.RATE_LIMIT_BACKEND)
+login_limiter = AuthRateLimiter(
+    "login",
+    rate_limit_backend,
+    by_ip=RateLimit(settings.LOGIN_RATE_LIMIT_IP_BURST, settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE),
+    by_email=RateLimit(settings.LOGIN_RATE_LIMIT_EMAIL_BURST, settings.LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE),
+)
+signup_limiter = AuthRateLimiter(
+    "signup",
+    rate_limit_backend,
+    by_ip=RateLimit(settings.SIGNUP_RATE_LIMIT_IP_BURST, settings.SIGNUP_RATE_LIMIT_IP_PER_MINUTE),
+    by_email=RateLimit(settings.SIGNUP_RATE_LIMIT_EMAIL_BURST, settings.SIGNUP_RATE_LIMIT_EMAIL_PER_MINUTE),
+)
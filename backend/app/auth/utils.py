@@ -7,3 +7,17 @@ def verify_password(plain_password, hashed_password):
 
 def get_password_hash(password):
     return pwd_context.hash(password)
+
+def load_hash_backend():
+    """Loads the bcrypt backend, which passlib otherwise does on the first hash."""
+    pwd_context.handler("bcrypt").get_backend()
+
+# The pool is imported lazily so that its worker processes, which unpickle the
+# functions above, only need to import passlib.
+async def verify_password_async(plain_password, hashed_password):
+    from app.auth.hashing import hashing_pool
+    return await hashing_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    from app.auth.hashing import hashing_pool
+    return await hashing_pool.run(get_password_hash, password)
@@ -0,0 +1,107 @@
+from typing import Literal
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    DATABASE_URL: str
+    # "async" runs the routers on an AsyncSession (psycopg3 async driver),
+    # "sync" keeps the classic Session and runs each statement in the threadpool.
+    DATABASE_MODE: Literal["async", "sync"] = "async"
+
+    # Pool sizing and timeouts apply to server databases; SQLite keeps its
+    # default pools. A statement timeout of 0 disables it.
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT_SECONDS: float = 30
+    DATABASE_POOL_RECYCLE_SECONDS: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_STATEMENT_TIMEOUT_MS: int = 30000
+    # GET requests read from the replica when one is set, except from a
+    # client that wrote within the last READ_YOUR_WRITES_SECONDS.
+    DATABASE_REPLICA_URL: str = ""
+    DATABASE_REPLICA_POOL_SIZE: int = 5
+    DATABASE_REPLICA_MAX_OVERFLOW: int = 10
+    DATABASE_REPLICA_STATEMENT_TIMEOUT_MS: int = 10000
+    DATABASE_READ_YOUR_WRITES_SECONDS: float = 5
+
+    # 0 means "size from the CPU count" (pending defaults to 4 per worker).
+    HASHING_WORKERS: int = 0
+    HASHING_MAX_PENDING: int = 0
+
+    # Token buckets for the auth endpoints: BURST requests at once, refilled
+    # at PER_MINUTE; both must be positive. EMAIL buckets count failed
+    # attempts only. RATE_LIMIT_BACKEND is "module:factory" for a shared
+    # store; empty keeps the buckets in process.
+    RATE_LIMIT_BACKEND: str = ""
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+    LOGIN_RATE_LIMIT_IP_BURST: int = Field(20, ge=1)
+    LOGIN_RATE_LIMIT_IP_PER_MINUTE: float = Field(10, gt=0)
+    LOGIN_RATE_LIMIT_EMAIL_BURST: int = Field(5, ge=1)
+    LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE: float = Field(2, gt=0)
+    SIGNUP_RATE_LIMIT_IP_BURST: int = Field(5, ge=1)
+    SIGNUP_RATE_LIMIT_IP_PER_MINUTE: float = Field(2, gt=0)
+    SIGNUP_RATE_LIMIT_EMAIL_BURST: int = Field(3, ge=1)
+    SIGNUP_RATE_LIMIT_EMAIL_PER_MINUTE: float = Field(1, gt=0)
+
+    # Authenticated users cached per worker. A change to a user's email,
+    # password or active flag evicts them on commit in the worker that made
+    # it; other workers keep serving the cached user for up to
+    # PRINCIPAL_CACHE_TTL_SECONDS.
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    # Serialized /boards/{id}/full payloads kept per worker, by total size;
+    # 0 disables the cache. BOARD_CACHE_BACKEND is "module:factory" for a
+    # shared store.
+    BOARD_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    BOARD_CACHE_BACKEND: str = ""
+
+    # Board activity is buffered per worker and written in multi-row inserts
+    # every ACTIVITY_FLUSH_SECONDS, or sooner once ACTIVITY_FLUSH_ROWS are waiting.
+    ACTIVITY_FLUSH_ROWS: int = 500
+    ACTIVITY_FLUSH_SECONDS: float = 1.0
+    ACTIVITY_BUFFER_MAX_ROWS: int = 50000
+    # On Postgres, monthly activity partitions older than this are dropped;
+    # 0 keeps all history.
+    ACTIVITY_RETENTION_MONTHS: int = 12
+
+    # Change events buffered per WebSocket before the client is told to resync.
+    EVENT_QUEUE_SIZE: int = 256
+
+    # board_changes entries older than this are compacted away; clients
+    # further behind get a resync marker from /boards/{id}/changes.
+    CHANGE_LOG_RETENTION_HOURS: int = 168
+    CHANGE_LOG_COMPACTION_INTERVAL_SECONDS: int = 600
+
+    # Boards with more tasks than this are hidden at once and purged in the
+    # background, BOARD_PURGE_BATCH_SIZE rows per transaction.
+    BOARD_SOFT_DELETE_THRESHOLD: int = 5000
+    BOARD_PURGE_BATCH_SIZE: int = 1000
+    BOARD_PURGE_INTERVAL_SECONDS: int = 30
+
+    # Fill the pools, start the hashing workers and compile hot statements
+    # before /ready reports the worker ready.
+    STARTUP_WARMUP: bool = True
+
+    MAIL_USERNAME: str = ""
+    MAIL_PASSWORD: str = ""
+    MAIL_FROM: str = "noreply@example.com"
+    MAIL_PORT: int = 587
+    MAIL_SERVER: str = "localhost"
+    MAIL_STARTTLS: bool = True
+    MAIL_SSL_TLS: bool = False
+
+    # Outbox sender (python -m app.services.outbox).
+    OUTBOX_SMTP_CONNECTIONS: int = 2
+    OUTBOX_BATCH_SIZE: int = 50
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_POLL_SECONDS: float = 2.0
+
+    FRONTEND_URL: str = "http://localhost:3000"
+
+
+settings = Settings()
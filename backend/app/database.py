@@ -1,21 +1,277 @@
-from sqlalchemy import create_engine
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from fastapi import Request
+from sqlalchemy import Select, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
-import os
+from app.config import settings
+from app.services.metrics import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool, instrument_engine
 
 load_dotenv()
 
-SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+psycopg",
+    "postgresql+psycopg2": "postgresql+psycopg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(url):
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+
+def engine_options(url, pool_size, max_overflow, statement_timeout_ms):
+    options = {"pool_pre_ping": settings.DATABASE_POOL_PRE_PING, "pool_recycle": settings.DATABASE_POOL_RECYCLE_SECONDS}
+    # SQLite gets its default pools, which never make a checkout wait and take
+    # no sizing; the queue pools used for server databases are swapped for
+    # timed ones.
+    if make_url(url).get_backend_name() == "sqlite":
+        return options
+    options.update(
+        poolclass=InstrumentedAsyncAdaptedQueuePool if settings.DATABASE_MODE == "async" else InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT_SECONDS,
+    )
+    if statement_timeout_ms:
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout_ms}"}
+    return options
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite ignores foreign keys, ON DELETE CASCADE included, unless asked per connection.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+def make_engine(url, name, pool_size, max_overflow, statement_timeout_ms):
+    options = engine_options(url, pool_size, max_overflow, statement_timeout_ms)
+    if settings.DATABASE_MODE == "async":
+        new_engine = create_async_engine(async_database_url(url), **options)
+    else:
+        new_engine = create_engine(url, **options)
+    if make_url(url).get_backend_name() == "sqlite":
+        event.listen(getattr(new_engine, "sync_engine", new_engine), "connect", _enable_sqlite_foreign_keys)
+    instrument_engine(new_engine, name)
+    return new_engine
+
+engine = make_engine(
+    SQLALCHEMY_DATABASE_URL, "primary",
+    settings.DATABASE_POOL_SIZE, settings.DATABASE_MAX_OVERFLOW, settings.DATABASE_STATEMENT_TIMEOUT_MS,
+)
+replica_engine = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = make_engine(
+        settings.DATABASE_REPLICA_URL, "replica",
+        settings.DATABASE_REPLICA_POOL_SIZE, settings.DATABASE_REPLICA_MAX_OVERFLOW, settings.DATABASE_REPLICA_STATEMENT_TIMEOUT_MS,
+    )
+
+
+async def prefill_pool(target):
+    """Opens as many connections as the pool keeps, all at once, and returns them to it.
+
+    The first requests then find warm connections instead of each paying for
+    a connect (and the first one for the dialect's server probing).
+    """
+    size = target.pool.size() if hasattr(target.pool, "size") else 1
+    if isinstance(target, AsyncEngine):
+        connections = await asyncio.gather(*(target.connect().start() for _ in range(size)))
+        await asyncio.gather(*(connection.close() for connection in connections))
+    else:
+        connections = await asyncio.gather(*(run_in_threadpool(target.connect) for _ in range(size)))
+        for connection in connections:
+            connection.close()
+
+
+async def dispose_engines():
+    for target in (engine, replica_engine):
+        if isinstance(target, AsyncEngine):
+            await target.dispose()
+        elif target is not None:
+            target.dispose()
+
+
+class RoutingSession(Session):
+    """Sends the plain SELECTs of read-only sessions to the replica.
+
+    Everything else, including SELECT ... FOR UPDATE and anything issued
+    while flushing, goes to the primary. Sessions are read-only only when
+    session_scope() is asked for one.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            replica_engine is not None
+            and self.info.get("read_only")
+            and not self._flushing
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+        ):
+            return getattr(replica_engine, "sync_engine", replica_engine)
+        return getattr(engine, "sync_engine", engine)
+
+
+if settings.DATABASE_MODE == "async":
+    SessionLocal = async_sessionmaker(sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False)
+else:
+    SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+
+
+class RecentWriters:
+    """Remembers, per client, the end of its read-your-writes window.
+
+    Replicas lag the primary, so a client that just wrote reads from the
+    primary for a short while and sees its own change. Entries live in a
+    bounded LRU dict per process, so with several workers the guarantee
+    holds only when the load balancer keeps a client on one worker.
+    """
+
+    def __init__(self, window_seconds, max_keys=100000):
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._deadlines = OrderedDict()
+
+    def wrote(self, key):
+        self._deadlines[key] = time.monotonic() + self.window_seconds
+        self._deadlines.move_to_end(key)
+        while len(self._deadlines) > self.max_keys:
+            self._deadlines.popitem(last=False)
+
+    def recently_wrote(self, key):
+        deadline = self._deadlines.get(key)
+        if deadline is None:
+            return False
+        if deadline < time.monotonic():
+            del self._deadlines[key]
+            return False
+        return True
+
+
+recent_writers = RecentWriters(settings.DATABASE_READ_YOUR_WRITES_SECONDS)
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+
+class ThreadedSession:
+    """Exposes the AsyncSession API over a sync Session.
+
+    Every call that may touch the database is handed to the threadpool, so the
+    routers are written once against the async API and run on either stack.
+    """
+
+    def __init__(self, sync_session):
+        self.sync_session = sync_session
+
+    @property
+    def info(self):
+        return self.sync_session.info
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    def expunge(self, instance):
+        self.sync_session.expunge(instance)
+
+    async def execute(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, params, **kwargs)
+
+    async def stream(self, statement, params=None, **kwargs):
+        result = await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+        return ThreadedResult(result)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def refresh(self, instance, attribute_names=None):
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def flush(self, objects=None):
+        await run_in_threadpool(self.sync_session.flush, objects)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+
+class ThreadedResult:
+    """The AsyncResult counterpart returned by ThreadedSession.stream().
+
+    Rows are fetched a partition at a time on the threadpool, so a
+    ``yield_per`` statement reads through a server-side cursor.
+    """
+
+    def __init__(self, result):
+        self.result = result
+
+    async def partitions(self, size=None):
+        partitions = self.result.partitions(size)
+        while (rows := await run_in_threadpool(next, partitions, None)) is not None:
+            yield rows
+
+
+@asynccontextmanager
+async def session_scope(read_only=False):
+    if settings.DATABASE_MODE == "async":
+        async with SessionLocal(info={"read_only": read_only}) as session:
+            yield session
+    else:
+        session = ThreadedSession(SessionLocal(info={"read_only": read_only}))
+        try:
+            yield session
+        finally:
+            await session.close()
+
+READ_METHODS = {"GET", "HEAD"}
+
+@asynccontextmanager
+async def _write_scope(client):
+    # The window opens before the write, so a read racing the response
+    # already goes to the primary, and is extended once the write is done.
+    if client:
+        recent_writers.wrote(client)
+    async with session_scope() as db:
+        yield db
+    if client:
+        recent_writers.wrote(client)
+
+async def get_db(request: Request):
+    # Clients are told apart by their bearer token, the key the principal cache uses too.
+    client = request.headers.get("authorization")
+    if request.method in READ_METHODS:
+        read_only = not (client and recent_writers.recently_wrote(client))
+        async with session_scope(read_only=read_only) as db:
+            yield db
+        return
+    async with _write_scope(client) as db:
+        yield db
+
+async def get_primary_db(request: Request):
+    """get_db for the GET routes that write, such as following an emailed link."""
+    async with _write_scope(request.headers.get("authorization")) as db:
         yield db
-    finally:
-        db.close()
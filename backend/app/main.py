@@ -1,8 +1,52 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import auth, boards, lists, tasks
+from app.routes import auth, boards, lists, search, tasks, ws
+from app.auth.hashing import hashing_pool
+from app.auth.principal_cache import principal_cache
+from app.auth.rate_limit import login_limiter, signup_limiter
+from app.config import settings
+from app.database import dispose_engines
+from app.schemas.common import MessageResponse
+from app.services.activity import activity_log
+from app.services.board_cache import board_cache
+from app.services.change_log import run_compaction
+from app.services.purge import run_purge
+from app.services.events import board_events
+from app.services.metrics import MetricsMiddleware, StatsCollector, registry
+from app.services.warmup import warm_up
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    app.state.ready = False
+    # Startup does no I/O of its own: warmup runs alongside, and /ready
+    # turns 200 once it is done.
+    background = [
+        asyncio.create_task(run_compaction(settings.CHANGE_LOG_RETENTION_HOURS, settings.CHANGE_LOG_COMPACTION_INTERVAL_SECONDS)),
+        asyncio.create_task(run_purge(settings.BOARD_PURGE_BATCH_SIZE, settings.BOARD_PURGE_INTERVAL_SECONDS)),
+        asyncio.create_task(activity_log.run()),
+    ]
+    if settings.STARTUP_WARMUP:
+        background.append(asyncio.create_task(warm_up(app)))
+    else:
+        app.state.ready = True
+    try:
+        yield
+    finally:
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        try:
+            await activity_log.flush()
+        finally:
+            hashing_pool.shutdown()
+            await dispose_engines()
+
+# Routes declare response models, so bodies are validated by pydantic and
+# rendered by orjson instead of walked through jsonable_encoder.
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -12,13 +56,35 @@ app.add_middleware(
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
 )
+# Outermost, so the latency covers CORS handling as well as the route.
+app.add_middleware(MetricsMiddleware)
+
+registry.register(StatsCollector("hashing_pool", "Password hashing pool statistics.", hashing_pool.stats))
+registry.register(StatsCollector("principal_cache", "Authenticated principal cache statistics.", principal_cache.stats))
+registry.register(StatsCollector("login_rate_limit", "Login rate limiter decisions.", login_limiter.stats))
+registry.register(StatsCollector("signup_rate_limit", "Signup rate limiter decisions.", signup_limiter.stats))
+registry.register(StatsCollector("activity_log", "Buffered activity log statistics.", activity_log.stats))
+registry.register(StatsCollector("board_cache", "Board snapshot cache statistics.", board_cache.stats))
+registry.register(StatsCollector("board_events", "Board event fan-out statistics.", board_events.stats))
 
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(boards.router, prefix="/boards", tags=["boards"])
 app.include_router(lists.router, prefix="/lists", tags=["lists"])
 app.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
+app.include_router(search.router, prefix="/search", tags=["search"])
+app.include_router(ws.router, prefix="/ws", tags=["ws"])
 
-@app.get("/")
+@app.get("/", response_model=MessageResponse)
 async def root():
     return {"message": "Welcome to the Brello API"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/ready", response_model=MessageResponse, include_in_schema=False)
+async def ready():
+    if not getattr(app.state, "ready", False):
+        raise HTTPException(status_code=503, detail="Warming up", headers={"Retry-After": "1"})
+    return {"message": "Ready"}
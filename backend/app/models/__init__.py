@@ -2,3 +2,8 @@ from .user import User
 from .board import Board
 from .list import List
 from .task import Task
+from .board_member import BoardMember
+from .board_change import BoardChange
+from .activity import Activity
+from .outbox import OutboxMessage
+from . import search_index
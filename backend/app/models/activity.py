@@ -0,0 +1,31 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import DDL, JSON, Column, DateTime, Index, Integer, String, Uuid, event
+from app.database import Base
+
+class Activity(Base):
+    __tablename__ = "activity"
+
+    # Ids are generated by the writer, so rows can be buffered and inserted
+    # in bulk, and the partition key can be part of the primary key.
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+    # No foreign keys, as in board_changes: rows are written after the change
+    # committed, possibly once the board is already gone.
+    board_id = Column(Integer, nullable=False)
+    user_id = Column(Integer)
+    type = Column(String, nullable=False)
+    data = Column(JSON, nullable=False)
+
+    __table_args__ = (
+        Index("ix_activity_board_id_created_at", "board_id", "created_at", "id"),
+        # Postgres keeps one partition per month (see services.activity);
+        # past ACTIVITY_RETENTION_MONTHS, history is dropped a partition at a time.
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+# Rows outside every monthly partition land here rather than failing the
+# insert. Migrations add the same partition; this listener covers create_all().
+event.listen(Activity.__table__, "after_create", DDL(
+    "CREATE TABLE activity_default PARTITION OF activity DEFAULT"
+).execute_if(dialect="postgresql"))
@@ -1,12 +1,12 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Table
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Table
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 board_user_association = Table(
     'board_user_association',
     Base.metadata,
-    Column('board_id', Integer, ForeignKey('boards.id')),
-    Column('user_id', Integer, ForeignKey('users.id'))
+    Column('board_id', Integer, ForeignKey('boards.id', ondelete='CASCADE'), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True, index=True)
 )
 
 class Board(Base):
@@ -15,8 +15,22 @@ class Board(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     background_color = Column(String)
-    owner_id = Column(Integer, ForeignKey("users.id"))
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True)
+    # Bumped once per change recorded under the board (see services.board_changes).
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Templates are listed in the catalogue and can be cloned by any user.
+    is_template = Column(Boolean, nullable=False, default=False, server_default="false")
+    # Set when a large board is soft-deleted; services.purge removes it later.
+    deleted_at = Column(DateTime, nullable=True)
 
     owner = relationship("User", back_populates="boards")
-    lists = relationship("List", back_populates="board", cascade="all, delete-orphan")
-    shared_users = relationship("User", secondary=board_user_association, back_populates="shared_boards")
+    # Child rows go through ON DELETE CASCADE; passive_deletes keeps the ORM
+    # from loading them just to delete them one by one.
+    lists = relationship("List", back_populates="board", cascade="all, delete-orphan", passive_deletes=True, order_by="List.position")
+    members = relationship("BoardMember", back_populates="board", cascade="all, delete-orphan", passive_deletes=True)
+    shared_users = relationship("User", secondary=board_user_association, back_populates="shared_boards", passive_deletes=True)
+
+    __table_args__ = (
+        Index("ix_boards_is_template_id", "is_template", "id"),
+        Index("ix_boards_deleted_at", "deleted_at"),
+    )
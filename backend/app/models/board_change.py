@@ -0,0 +1,18 @@
+from datetime import datetime
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String
+from app.database import Base
+
+class BoardChange(Base):
+    __tablename__ = "board_changes"
+
+    # No foreign key: a board's log is removed in the same transaction that
+    # deletes the board, after the board row itself is gone.
+    board_id = Column(Integer, primary_key=True)
+    seq = Column(Integer, primary_key=True)
+    type = Column(String, nullable=False)
+    data = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_board_changes_created_at", "created_at"),
+    )
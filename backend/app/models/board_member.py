@@ -0,0 +1,16 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class BoardMember(Base):
+    __tablename__ = "board_members"
+
+    board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    role = Column(String, nullable=False)
+
+    board = relationship("Board", back_populates="members")
+
+    __table_args__ = (
+        Index("ix_board_members_user_id_board_id", "user_id", "board_id"),
+    )
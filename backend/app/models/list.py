@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -7,7 +7,12 @@ class List(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
-    board_id = Column(Integer, ForeignKey("boards.id"))
+    board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"))
+    position = Column(String, nullable=False)
 
     board = relationship("Board", back_populates="lists")
-    tasks = relationship("Task", back_populates="list", cascade="all, delete-orphan")
+    tasks = relationship("Task", back_populates="list", cascade="all, delete-orphan", passive_deletes=True, order_by="Task.position")
+
+    __table_args__ = (
+        Index("ix_lists_board_id_position", "board_id", "position"),
+    )
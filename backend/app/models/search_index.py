@@ -0,0 +1,63 @@
+from sqlalchemy import DDL, event
+from .board import Board
+from .list import List
+from .task import Task
+
+# Text search configuration baked into the generated columns. Changing it
+# needs a migration that recreates them.
+SEARCH_CONFIG = "english"
+
+# Searchable text per table, most important column first. Postgres weights
+# the columns A, B, ... and SQLite weights them the same way in bm25().
+SEARCHABLE = {
+    Board.__table__: ("title",),
+    List.__table__: ("title",),
+    Task.__table__: ("title", "description"),
+}
+WEIGHTS = "ABCD"
+
+
+def search_vector_expression(columns):
+    return " || ".join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({column}, '')), '{weight}')"
+        for column, weight in zip(columns, WEIGHTS)
+    )
+
+
+def fts_table(table):
+    return f"{table.name}_fts"
+
+
+# Postgres: a stored generated tsvector column plus a GIN index on it, so the
+# vector is recomputed by the row write itself and can never go stale.
+# Migrations add the same objects; these listeners cover create_all().
+for table, columns in SEARCHABLE.items():
+    event.listen(table, "after_create", DDL(
+        f"ALTER TABLE {table.name} ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS ({search_vector_expression(columns)}) STORED"
+    ).execute_if(dialect="postgresql"))
+    event.listen(table, "after_create", DDL(
+        f"CREATE INDEX ix_{table.name}_search_vector ON {table.name} USING gin (search_vector)"
+    ).execute_if(dialect="postgresql"))
+
+
+# SQLite: an external-content FTS5 table per searchable table, keyed by the
+# row id and kept in step by triggers.
+for table, columns in SEARCHABLE.items():
+    fts = fts_table(table)
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    statements = [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='{table.name}', content_rowid='id', tokenize='porter')",
+        f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table.name} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table.name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER {fts}_update AFTER UPDATE OF {names} ON {table.name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+    ]
+    for statement in statements:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    event.listen(table, "before_drop", DDL(f"DROP TABLE IF EXISTS {fts}").execute_if(dialect="sqlite"))
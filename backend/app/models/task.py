@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -8,6 +8,11 @@ class Task(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     description = Column(String)
-    list_id = Column(Integer, ForeignKey("lists.id"))
+    list_id = Column(Integer, ForeignKey("lists.id", ondelete="CASCADE"))
+    position = Column(String, nullable=False)
 
     list = relationship("List", back_populates="tasks")
+
+    __table_args__ = (
+        Index("ix_tasks_list_id_position", "list_id", "position"),
+    )
@@ -13,3 +13,4 @@ class User(Base):
     confirmation_token = Column(String, unique=True, nullable=True)
 
     boards = relationship("Board", back_populates="owner")
+    shared_boards = relationship("Board", secondary="board_user_association", back_populates="shared_users")
@@ -1,71 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_primary_db
 from app.models.user import User
 from app.auth.jwt import create_access_token
-from app.auth.utils import verify_password, get_password_hash
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
+from app.auth.rate_limit import login_limiter, signup_limiter
+from app.auth.utils import verify_password_async, get_password_hash_async
 from pydantic import EmailStr
 from app.config import settings
+from app.schemas.common import MessageResponse
+from app.schemas.user import TokenResponse
+from app.services.outbox import enqueue_email
 import secrets
 
 router = APIRouter()
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_TLS=True,
-    MAIL_SSL=False,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True
-)
-
-async def send_email_async(subject: str, email_to: str, body: str):
-    message = MessageSchema(
-        subject=subject,
-        recipients=[email_to],
-        body=body,
-        subtype="html"
-    )
-    fm = FastMail(conf)
-    await fm.send_message(message)
-
-@router.post("/signup")
-async def signup(email: EmailStr, password: str, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == email).first()
+@router.post("/signup", response_model=MessageResponse)
+async def signup(request: Request, email: EmailStr, password: str, db: AsyncSession = Depends(get_db)):
+    await signup_limiter.check(request, email)
+    db_user = await db.scalar(select(User).where(User.email == email))
     if db_user:
+        await signup_limiter.failed(email)
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = get_password_hash(password)
+    hashed_password = await get_password_hash_async(password)
     confirmation_token = secrets.token_urlsafe(32)
     new_user = User(email=email, hashed_password=hashed_password, confirmation_token=confirmation_token)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
 
     confirmation_link = f"{settings.FRONTEND_URL}/confirm-email?token={confirmation_token}"
     email_body = f"Please click the following link to confirm your email: {confirmation_link}"
-    background_tasks.add_task(send_email_async, "Confirm your email", email, email_body)
+    # Queued in the same transaction as the user, and sent by the outbox worker.
+    enqueue_email(db, email, "Confirm your email", email_body)
+    await db.commit()
 
     return {"message": "User created successfully. Please check your email to confirm your account."}
 
-@router.get("/confirm-email")
-async def confirm_email(token: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.confirmation_token == token).first()
+@router.get("/confirm-email", response_model=MessageResponse)
+async def confirm_email(token: str, db: AsyncSession = Depends(get_primary_db)):
+    user = await db.scalar(select(User).where(User.confirmation_token == token))
     if not user:
         raise HTTPException(status_code=400, detail="Invalid confirmation token")
     user.is_confirmed = True
     user.confirmation_token = None
-    db.commit()
+    await db.commit()
     return {"message": "Email confirmed successfully"}
 
-@router.post("/token")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+@router.post("/token", response_model=TokenResponse)
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    await login_limiter.check(request, form_data.username)
+    user = await db.scalar(select(User).where(User.email == form_data.username))
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
+        await login_limiter.failed(form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
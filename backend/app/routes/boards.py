@@ -1,80 +1,152 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from typing import Optional
+import orjson
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from app.database import get_db
-from app.models.board import Board
+from app.models.board import Board, board_user_association
+from app.models.board_member import BoardMember
+from app.models.list import List
 from app.models.user import User
 from app.auth.jwt import verify_token
+from app.config import settings
+from app.auth.access import EDITOR, OWNER, get_board_for, get_board_version, get_clone_source, membership
+from app.schemas.board import ActivityResponse, BoardChangesResponse, BoardFullResponse, BoardImportResponse, BoardResponse
+from app.schemas.common import MessageResponse
+from app.schemas.pagination import Page
+from app.services.activity import activity_page
+from app.services.board_cache import board_cache
+from app.services.board_changes import commit_changes, record_change
+from app.services.board_transfer import import_records, ndjson_lines, stream_export
+from app.services.change_log import DEFAULT_CHANGES_LIMIT, changes_since
+from app.services.cloning import copy_board
+from app.services.etags import conditional_get
+from app.services.pagination import DEFAULT_PAGE_SIZE, paginate
+from app.services.purge import is_large_board, purge_activity, soft_delete_board
 
 router = APIRouter()
 
-@router.post("/")
-def create_board(title: str, background_color: str, current_user: User = Depends(verify_token), db: Session = Depends(get_db)):
-    new_board = Board(title=title, background_color=background_color, owner_id=current_user.id)
+@router.post("/", response_model=BoardResponse)
+async def create_board(title: str, background_color: str, is_template: bool = False, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    new_board = Board(
+        title=title,
+        background_color=background_color,
+        is_template=is_template,
+        owner_id=current_user.id,
+        members=[BoardMember(user_id=current_user.id, role=OWNER)],
+    )
     db.add(new_board)
-    db.commit()
-    db.refresh(new_board)
+    await db.commit()
+    await db.refresh(new_board)
     return new_board
 
-@router.get("/")
-def get_boards(current_user: User = Depends(verify_token), db: Session = Depends(get_db)):
-    boards = db.query(Board).filter(
-        or_(
-            Board.owner_id == current_user.id,
-            Board.shared_users.any(id=current_user.id)
-        )
-    ).all()
-    return boards
-
-@router.get("/{board_id}")
-def get_board(board_id: int, current_user: User = Depends(verify_token), db: Session = Depends(get_db)):
-    board = db.query(Board).filter(
-        Board.id == board_id,
-        or_(
-            Board.owner_id == current_user.id,
-            Board.shared_users.any(id=current_user.id)
-        )
-    ).first()
-    if not board:
-        raise HTTPException(status_code=404, detail="Board not found")
+@router.get("/", response_model=Page[BoardResponse])
+async def get_boards(cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    statement = select(Board).join(BoardMember, membership(Board.id, current_user))
+    return await paginate(db, statement, (Board.id,), cursor, limit)
+
+# Declared before /{board_id} so "templates" and "export" are not read as board ids.
+@router.get("/templates", response_model=Page[BoardResponse])
+async def get_templates(cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    return await paginate(db, select(Board).where(Board.is_template, Board.deleted_at.is_(None)), (Board.id,), cursor, limit)
+
+def ndjson_download(body, filename):
+    return StreamingResponse(body, media_type="application/x-ndjson", headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_boards(current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    return ndjson_download(stream_export(current_user, read_only=db.info["read_only"]), "boards.ndjson")
+
+@router.post("/import", response_model=BoardImportResponse)
+async def import_boards(request: Request, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    result = await import_records(db, current_user.id, ndjson_lines(request.stream()))
+    await db.commit()
+    return result
+
+@router.get("/{board_id}", response_model=BoardResponse)
+async def get_board(board_id: int, request: Request, response: Response, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    board = await get_board_for(db, board_id, current_user)
+    conditional_get(request, response, board.id, board.version)
     return board
 
-@router.put("/{board_id}")
-def update_board(board_id: int, title: str, background_color: str, current_user: User = Depends(verify_token), db: Session = Depends(get_db)):
-    board = db.query(Board).filter(Board.id == board_id, Board.owner_id == current_user.id).first()
-    if not board:
-        raise HTTPException(status_code=404, detail="Board not found")
+@router.get("/{board_id}/full", response_model=BoardFullResponse)
+async def get_board_full(board_id: int, request: Request, response: Response, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    version = await get_board_version(db, board_id, current_user)
+    headers = conditional_get(request, response, board_id, version)
+    payload = await board_cache.get(board_id, version)
+    if payload is None:
+        # One query for the board plus one per selectinload level, however many lists there are.
+        board = await get_board_for(db, board_id, current_user, options=[selectinload(Board.lists).selectinload(List.tasks)])
+        payload = orjson.dumps(BoardFullResponse.model_validate(board).model_dump(mode="json"))
+        await board_cache.set(board_id, board.version, payload)
+    return Response(payload, media_type="application/json", headers=headers)
+
+@router.get("/{board_id}/changes", response_model=BoardChangesResponse)
+async def get_board_changes(board_id: int, since: int = Query(ge=0), limit: int = DEFAULT_CHANGES_LIMIT, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    version = await get_board_version(db, board_id, current_user)
+    return await changes_since(db, board_id, version, since, limit)
+
+@router.get("/{board_id}/export", response_class=StreamingResponse)
+async def export_board(board_id: int, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    await get_board_version(db, board_id, current_user)
+    return ndjson_download(stream_export(current_user, board_id, read_only=db.info["read_only"]), f"board-{board_id}.ndjson")
+
+@router.get("/{board_id}/activity", response_model=Page[ActivityResponse])
+async def get_board_activity(board_id: int, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    await get_board_version(db, board_id, current_user)
+    return await activity_page(db, board_id, cursor, limit)
+
+@router.put("/{board_id}", response_model=BoardResponse)
+async def update_board(board_id: int, title: str, background_color: str, is_template: Optional[bool] = None, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    board = await get_board_for(db, board_id, current_user, OWNER)
     board.title = title
     board.background_color = background_color
-    db.commit()
-    db.refresh(board)
+    if is_template is not None:
+        board.is_template = is_template
+    record_change(db, board.id, "board.updated", board)
+    await commit_changes(db)
+    await db.refresh(board)
     return board
 
-@router.delete("/{board_id}")
-def delete_board(board_id: int, current_user: User = Depends(verify_token), db: Session = Depends(get_db)):
-    board = db.query(Board).filter(Board.id == board_id, Board.owner_id == current_user.id).first()
-    if not board:
-        raise HTTPException(status_code=404, detail="Board not found")
-    db.delete(board)
-    db.commit()
+@router.delete("/{board_id}", response_model=MessageResponse)
+async def delete_board(board_id: int, background_tasks: BackgroundTasks, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    board = await get_board_for(db, board_id, current_user, OWNER)
+    if await is_large_board(db, board_id, settings.BOARD_SOFT_DELETE_THRESHOLD):
+        await soft_delete_board(db, board_id)
+    else:
+        # Lists, tasks and memberships go with it through ON DELETE CASCADE.
+        await db.delete(board)
+        record_change(db, board_id, "board.deleted", {"id": board_id})
+        # Activity has no foreign key to cascade through and can be long.
+        background_tasks.add_task(purge_activity, board_id, settings.BOARD_PURGE_BATCH_SIZE)
+    await commit_changes(db)
     return {"message": "Board deleted successfully"}
 
-@router.post("/{board_id}/share")
-def share_board(board_id: int, email: str, current_user: User = Depends(verify_token), db: Session = Depends(get_db)):
-    board = db.query(Board).filter(Board.id == board_id, Board.owner_id == current_user.id).first()
-    if not board:
-        raise HTTPException(status_code=404, detail="Board not found")
+@router.post("/{board_id}/clone", response_model=BoardResponse)
+async def clone_board(board_id: int, title: Optional[str] = None, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    source_id = await get_clone_source(db, board_id, current_user)
+    new_board_id = await copy_board(db, source_id, current_user.id, title)
+    await db.commit()
+    return await db.get(Board, new_board_id)
+
+@router.post("/{board_id}/share", response_model=MessageResponse)
+async def share_board(board_id: int, email: str, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    board = await get_board_for(db, board_id, current_user, OWNER)
 
-    user_to_share = db.query(User).filter(User.email == email).first()
+    user_to_share = await db.scalar(select(User).where(User.email == email))
     if not user_to_share:
         raise HTTPException(status_code=404, detail="User not found")
 
     if user_to_share.id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot share board with yourself")
 
-    if user_to_share in board.shared_users:
+    if await db.get(BoardMember, (board.id, user_to_share.id)):
         raise HTTPException(status_code=400, detail="Board already shared with this user")
 
-    board.shared_users.append(user_to_share)
-    db.commit()
+    db.add(BoardMember(board_id=board.id, user_id=user_to_share.id, role=EDITOR))
+    await db.execute(board_user_association.insert().values(board_id=board.id, user_id=user_to_share.id))
+    record_change(db, board.id, "member.added", {"user_id": user_to_share.id, "role": EDITOR})
+    await commit_changes(db)
     return {"message": "Board shared successfully"}
@@ -1,47 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.list import List
-from app.models.board import Board
 from app.models.user import User
 from app.auth.jwt import verify_token
+from app.auth.access import get_board_version, get_list_for, require_board_role
+from app.schemas.list import ListResponse
+from app.schemas.common import MessageResponse
+from app.schemas.pagination import Page
+from app.services.board_changes import commit_changes, record_change
+from app.services.etags import conditional_get
+from app.services.ordering import needs_rebalance, position_between, rebalance
+from app.services.pagination import DEFAULT_PAGE_SIZE, paginate
 
 router = APIRouter()
 
-@router.post("/{board_id}")
-def create_list(board_id: int, title: str, current_user: User = Depends(verify_token), db: Session = Depends(get_db)):
-    board = db.query(Board).filter(Board.id == board_id, Board.owner_id == current_user.id).first()
-    if not board:
-        raise HTTPException(status_code=404, detail="Board not found")
-    new_list = List(title=title, board_id=board_id)
+@router.post("/{board_id}", response_model=ListResponse)
+async def create_list(board_id: int, title: str, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    await require_board_role(db, board_id, current_user)
+    position = await position_between(db, List, List.board_id, board_id)
+    new_list = List(title=title, board_id=board_id, position=position)
     db.add(new_list)
-    db.commit()
-    db.refresh(new_list)
+    record_change(db, board_id, "list.created", new_list)
+    await commit_changes(db)
+    await db.refresh(new_list)
     return new_list
 
-@router.get("/{board_id}")
-def get_lists(board_id: int, current_user: User = Depends(verify_token), db: Session = Depends(get_db)):
-    board = db.query(Board).filter(Board.id == board_id, Board.owner_id == current_user.id).first()
-    if not board:
-        raise HTTPException(status_code=404, detail="Board not found")
-    lists = db.query(List).filter(List.board_id == board_id).all()
-    return lists
+@router.get("/{board_id}", response_model=Page[ListResponse])
+async def get_lists(board_id: int, request: Request, response: Response, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    conditional_get(request, response, board_id, await get_board_version(db, board_id, current_user))
+    return await paginate(db, select(List).where(List.board_id == board_id), (List.position, List.id), cursor, limit)
 
-@router.put("/{list_id}")
-def update_list(list_id: int, title: str, current_user: User = Depends(verify_token), db: Session = Depends(get_db)):
-    list_item = db.query(List).join(Board).filter(List.id == list_id, Board.owner_id == current_user.id).first()
-    if not list_item:
-        raise HTTPException(status_code=404, detail="List not found")
+@router.put("/{list_id}", response_model=ListResponse)
+async def update_list(list_id: int, title: str, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    list_item = await get_list_for(db, list_id, current_user)
     list_item.title = title
-    db.commit()
-    db.refresh(list_item)
+    record_change(db, list_item.board_id, "list.updated", list_item)
+    await commit_changes(db)
+    await db.refresh(list_item)
     return list_item
 
-@router.delete("/{list_id}")
-def delete_list(list_id: int, current_user: User = Depends(verify_token), db: Session = Depends(get_db)):
-    list_item = db.query(List).join(Board).filter(List.id == list_id, Board.owner_id == current_user.id).first()
-    if not list_item:
-        raise HTTPException(status_code=404, detail="List not found")
-    db.delete(list_item)
-    db.commit()
+@router.put("/{list_id}/move", response_model=ListResponse)
+async def move_list(list_id: int, background_tasks: BackgroundTasks, after_id: Optional[int] = None, before_id: Optional[int] = None, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    list_item = await get_list_for(db, list_id, current_user)
+    list_item.position = await position_between(db, List, List.board_id, list_item.board_id, after_id, before_id, moving_id=list_id)
+    record_change(db, list_item.board_id, "list.moved", list_item)
+    await commit_changes(db)
+    await db.refresh(list_item)
+    if needs_rebalance(list_item.position):
+        background_tasks.add_task(rebalance, List, List.board_id, list_item.board_id, list_item.board_id)
+    return list_item
+
+@router.delete("/{list_id}", response_model=MessageResponse)
+async def delete_list(list_id: int, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    list_item = await get_list_for(db, list_id, current_user)
+    await db.delete(list_item)
+    record_change(db, list_item.board_id, "list.deleted", {"id": list_id})
+    await commit_changes(db)
     return {"message": "List deleted successfully"}
@@ -0,0 +1,16 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db
+from app.models.user import User
+from app.auth.jwt import verify_token
+from app.schemas.pagination import Page
+from app.schemas.search import SearchResult
+from app.services.pagination import DEFAULT_PAGE_SIZE
+from app.services.search import search
+
+router = APIRouter()
+
+@router.get("", response_model=Page[SearchResult])
+async def search_all(q: str = Query(min_length=1, max_length=200), cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    return await search(db, current_user, q, cursor, limit)
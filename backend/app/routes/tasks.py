@@ -1,62 +1,173 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.task import Task
 from app.models.list import List
-from app.models.board import Board
 from app.models.user import User
 from app.auth.jwt import verify_token
+from app.auth.access import get_list_for, get_list_version, get_task_for, membership
+from app.models.board_member import BoardMember
+from app.schemas.common import MessageResponse
+from app.schemas.pagination import Page
+from app.schemas.task import TaskBatchRequest, TaskBatchResponse, TaskResponse
+from app.services.board_changes import commit_changes, record_change
+from app.services.etags import conditional_get
+from app.services.ordering import key_between, needs_rebalance, position_between, rebalance
+from app.services.pagination import DEFAULT_PAGE_SIZE, paginate
 
 router = APIRouter()
 
-@router.post("/{list_id}")
-def create_task(list_id: int, title: str, description: str, current_user: User = Depends(verify_token), db: Session = Depends(get_db)):
-    list_item = db.query(List).join(Board).filter(List.id == list_id, Board.owner_id == current_user.id).first()
-    if not list_item:
-        raise HTTPException(status_code=404, detail="List not found")
-    new_task = Task(title=title, description=description, list_id=list_id)
+def record_task_move(db, task, from_board_id, to_board_id):
+    record_change(db, to_board_id, "task.moved", task)
+    if from_board_id != to_board_id:
+        record_change(db, from_board_id, "task.deleted", {"id": task.id})
+
+@router.post("/batch", response_model=TaskBatchResponse)
+async def batch_tasks(batch: TaskBatchRequest, background_tasks: BackgroundTasks, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    operations = batch.operations
+
+    # Authorize every referenced task and target list with one set-based query each.
+    task_ids = {op.task_id for op in operations if op.op != "create"}
+    task_boards = {}
+    if task_ids:
+        rows = await db.execute(
+            select(Task.id, List.board_id).join(List).join(BoardMember, membership(List.board_id, current_user))
+            .where(Task.id.in_(task_ids))
+        )
+        task_boards = dict(rows.all())
+    target_list_ids = {op.list_id for op in operations if op.op in ("create", "move")}
+    list_boards = {}
+    if target_list_ids:
+        rows = await db.execute(
+            select(List.id, List.board_id).join(BoardMember, membership(List.board_id, current_user))
+            .where(List.id.in_(target_list_ids))
+        )
+        list_boards = dict(rows.all())
+    rejected = [
+        index for index, op in enumerate(operations)
+        if (op.op != "create" and op.task_id not in task_boards)
+        or (op.op in ("create", "move") and op.list_id not in list_boards)
+    ]
+    if rejected:
+        raise HTTPException(status_code=404, detail={"message": "Task or list not found", "operations": rejected})
+
+    # Created and moved tasks are appended to their target list in operation order.
+    last_positions = {}
+    if target_list_ids:
+        last_positions = dict((await db.execute(
+            select(Task.list_id, func.max(Task.position)).where(Task.list_id.in_(target_list_ids)).group_by(Task.list_id)
+        )).all())
+
+    positions = {}
+    for index, op in enumerate(operations):
+        if op.op in ("create", "move"):
+            positions[index] = last_positions[op.list_id] = key_between(last_positions.get(op.list_id), None)
+
+    creates = [(index, op) for index, op in enumerate(operations) if op.op == "create"]
+    created = []
+    if creates:
+        created = (await db.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True),
+            [
+                {"title": op.title, "description": op.description, "list_id": op.list_id, "position": positions[index]}
+                for index, op in creates
+            ],
+        )).all()
+
+    # Fold updates and moves into one row of changes per task, then issue one
+    # executemany UPDATE per distinct set of changed columns.
+    changes, moved = {}, set()
+    for index, op in enumerate(operations):
+        if op.op == "update":
+            changes.setdefault(op.task_id, {}).update(op.model_dump(include={"title", "description"}, exclude_unset=True))
+        elif op.op == "move":
+            changes.setdefault(op.task_id, {}).update(list_id=op.list_id, position=positions[index])
+            moved.add(op.task_id)
+    deleted_ids = {op.task_id for op in operations if op.op == "delete"}
+    groups = {}
+    for task_id, values in changes.items():
+        if task_id not in deleted_ids and values:
+            groups.setdefault(frozenset(values), []).append({"id": task_id, **values})
+    for rows in groups.values():
+        await db.execute(update(Task), rows)
+    if deleted_ids:
+        await db.execute(delete(Task).where(Task.id.in_(deleted_ids)).execution_options(synchronize_session=False))
+
+    updated = {}
+    updated_ids = set(changes) - deleted_ids
+    if updated_ids:
+        updated = {task.id: task for task in await db.scalars(select(Task).where(Task.id.in_(updated_ids)))}
+
+    for task in created:
+        record_change(db, list_boards[task.list_id], "task.created", task)
+    for task_id, task in updated.items():
+        if task_id in moved:
+            record_task_move(db, task, task_boards[task_id], list_boards[task.list_id])
+        else:
+            record_change(db, task_boards[task_id], "task.updated", task)
+    for task_id in deleted_ids:
+        record_change(db, task_boards[task_id], "task.deleted", {"id": task_id})
+    await commit_changes(db)
+    for list_id, position in last_positions.items():
+        if position is not None and needs_rebalance(position):
+            background_tasks.add_task(rebalance, Task, Task.list_id, list_id, list_boards[list_id])
+
+    created_tasks = iter(created)
+    results = []
+    for index, op in enumerate(operations):
+        if op.op == "create":
+            task = next(created_tasks)
+            results.append({"index": index, "op": op.op, "task_id": task.id, "task": task})
+        else:
+            results.append({"index": index, "op": op.op, "task_id": op.task_id, "task": updated.get(op.task_id)})
+    return {"results": results}
+
+@router.post("/{list_id}", response_model=TaskResponse)
+async def create_task(list_id: int, title: str, description: str, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    list_item = await get_list_for(db, list_id, current_user)
+    position = await position_between(db, Task, Task.list_id, list_id)
+    new_task = Task(title=title, description=description, list_id=list_id, position=position)
     db.add(new_task)
-    db.commit()
-    db.refresh(new_task)
+    record_change(db, list_item.board_id, "task.created", new_task)
+    await commit_changes(db)
+    await db.refresh(new_task)
     return new_task
 
-@router.get("/{list_id}")
-def get_tasks(list_id: int, current_user: User = Depends(verify_token), db: Session = Depends(get_db)):
-    list_item = db.query(List).join(Board).filter(List.id == list_id, Board.owner_id == current_user.id).first()
-    if not list_item:
-        raise HTTPException(status_code=404, detail="List not found")
-    tasks = db.query(Task).filter(Task.list_id == list_id).all()
-    return tasks
-
-@router.put("/{task_id}")
-def update_task(task_id: int, title: str, description: str, current_user: User = Depends(verify_token), db: Session = Depends(get_db)):
-    task = db.query(Task).join(List, Board).filter(Task.id == task_id, Board.owner_id == current_user.id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+@router.get("/{list_id}", response_model=Page[TaskResponse])
+async def get_tasks(list_id: int, request: Request, response: Response, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    board_id, version = await get_list_version(db, list_id, current_user)
+    conditional_get(request, response, board_id, version)
+    return await paginate(db, select(Task).where(Task.list_id == list_id), (Task.position, Task.id), cursor, limit)
+
+@router.put("/{task_id}", response_model=TaskResponse)
+async def update_task(task_id: int, title: str, description: str, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    task = await get_task_for(db, task_id, current_user)
     task.title = title
     task.description = description
-    db.commit()
-    db.refresh(task)
+    record_change(db, task.list.board_id, "task.updated", task)
+    await commit_changes(db)
+    await db.refresh(task)
     return task
 
-@router.delete("/{task_id}")
-def delete_task(task_id: int, current_user: User = Depends(verify_token), db: Session = Depends(get_db)):
-    task = db.query(Task).join(List, Board).filter(Task.id == task_id, Board.owner_id == current_user.id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    db.delete(task)
-    db.commit()
+@router.delete("/{task_id}", response_model=MessageResponse)
+async def delete_task(task_id: int, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    task = await get_task_for(db, task_id, current_user)
+    await db.delete(task)
+    record_change(db, task.list.board_id, "task.deleted", {"id": task_id})
+    await commit_changes(db)
     return {"message": "Task deleted successfully"}
 
-@router.put("/{task_id}/move")
-def move_task(task_id: int, new_list_id: int, current_user: User = Depends(verify_token), db: Session = Depends(get_db)):
-    task = db.query(Task).join(List, Board).filter(Task.id == task_id, Board.owner_id == current_user.id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    new_list = db.query(List).join(Board).filter(List.id == new_list_id, Board.owner_id == current_user.id).first()
-    if not new_list:
-        raise HTTPException(status_code=404, detail="New list not found")
+@router.put("/{task_id}/move", response_model=TaskResponse)
+async def move_task(task_id: int, new_list_id: int, background_tasks: BackgroundTasks, after_id: Optional[int] = None, before_id: Optional[int] = None, current_user: User = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    task = await get_task_for(db, task_id, current_user)
+    new_list = await get_list_for(db, new_list_id, current_user, detail="New list not found")
+    task.position = await position_between(db, Task, Task.list_id, new_list_id, after_id, before_id, moving_id=task_id)
     task.list_id = new_list_id
-    db.commit()
-    db.refresh(task)
+    record_task_move(db, task, task.list.board_id, new_list.board_id)
+    await commit_changes(db)
+    await db.refresh(task)
+    if needs_rebalance(task.position):
+        background_tasks.add_task(rebalance, Task, Task.list_id, new_list_id, new_list.board_id)
     return task
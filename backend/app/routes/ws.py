@@ -0,0 +1,77 @@
+import asyncio
+import time
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from app.database import session_scope
+from jose import jwt
+from app.auth.jwt import verify_token
+from app.auth.access import require_board_role
+from app.services.events import RESYNC, board_events
+
+router = APIRouter()
+
+# Application close codes, after the HTTP statuses a request would get.
+WS_CLOSE_UNAUTHORIZED = 4401
+WS_CLOSE_FORBIDDEN = 4403
+
+async def still_member(board_id, user):
+    async with session_scope() as db:
+        try:
+            await require_board_role(db, board_id, user)
+        except HTTPException:
+            return False
+    return True
+
+async def forward_events(websocket: WebSocket, subscription, user):
+    while True:
+        event = await subscription.get()
+        # Access is checked again whenever it may have changed; a resync may
+        # stand in for a dropped membership event.
+        if (event["type"].startswith("member.") or event is RESYNC) and not await still_member(subscription.board_id, user):
+            await websocket.close(code=WS_CLOSE_FORBIDDEN)
+            return
+        await websocket.send_json(event)
+        if event["type"] == "board.deleted":
+            await websocket.close()
+            return
+
+async def expire_token(websocket: WebSocket, expires_at):
+    await asyncio.sleep(max(0, expires_at - time.time()))
+    await websocket.close(code=WS_CLOSE_UNAUTHORIZED)
+
+async def drain_messages(websocket: WebSocket):
+    # Clients have nothing to send; reading only notices the disconnect.
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+
+@router.websocket("/boards/{board_id}")
+async def board_feed(websocket: WebSocket, board_id: int, token: str):
+    # Browsers cannot set headers on a WebSocket handshake, so the JWT comes
+    # in the query string. The session is released before streaming starts,
+    # and the feed is closed once the token expires.
+    async with session_scope() as db:
+        try:
+            user = await verify_token(token, db)
+            await require_board_role(db, board_id, user)
+        except HTTPException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+    expires_at = jwt.get_unverified_claims(token)["exp"]
+
+    with board_events.subscribe(board_id) as subscription:
+        await websocket.accept()
+        tasks = {
+            asyncio.create_task(forward_events(websocket, subscription, user)),
+            asyncio.create_task(expire_token(websocket, expires_at)),
+            asyncio.create_task(drain_messages(websocket)),
+        }
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                # A send to a client that just went away fails; that only ends the feed.
+                task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
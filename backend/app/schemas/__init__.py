@@ -0,0 +1,7 @@
+from .common import MessageResponse
+from .user import UserResponse, TokenResponse
+from .task import TaskResponse, TaskBatchRequest, TaskBatchResponse
+from .list import ListResponse, ListWithTasksResponse
+from .board import BoardResponse, BoardFullResponse, BoardChangeResponse, BoardChangesResponse
+from .pagination import Page
+from .search import SearchResult
@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+from pydantic import BaseModel, ConfigDict
+from .list import ListWithTasksResponse
+
+
+class BoardResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: Optional[str]
+    background_color: Optional[str]
+    owner_id: int
+    version: int
+    is_template: bool
+
+
+class BoardFullResponse(BoardResponse):
+    lists: list[ListWithTasksResponse]
+
+
+class BoardImportResponse(BaseModel):
+    boards: int
+    lists: int
+    tasks: int
+    board_ids: list[int]
+
+
+class BoardChangeResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    seq: int
+    type: str
+    data: dict[str, Any]
+    created_at: datetime
+
+
+class BoardChangesResponse(BaseModel):
+    board_id: int
+    version: int
+    # True when the log no longer reaches back to ``since``; refetch the
+    # board and continue from its version.
+    resync: bool
+    changes: list[BoardChangeResponse]
+    next_since: int
+    has_more: bool
+
+
+class ActivityResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    board_id: int
+    user_id: Optional[int]
+    type: str
+    data: dict[str, Any]
+    created_at: datetime
@@ -0,0 +1,16 @@
+from typing import Optional
+from pydantic import BaseModel, ConfigDict
+from .task import TaskResponse
+
+
+class ListResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: Optional[str]
+    board_id: int
+    position: str
+
+
+class ListWithTasksResponse(ListResponse):
+    tasks: list[TaskResponse]
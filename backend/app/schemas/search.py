@@ -0,0 +1,14 @@
+from typing import Literal, Optional
+from pydantic import BaseModel, ConfigDict
+
+
+class SearchResult(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    kind: Literal["board", "list", "task"]
+    id: int
+    board_id: int
+    list_id: Optional[int] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    rank: float
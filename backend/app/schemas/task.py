@@ -0,0 +1,58 @@
+from typing import Annotated, Literal, Optional, Union
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class TaskResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: Optional[str]
+    description: Optional[str]
+    list_id: int
+    position: str
+
+
+class TaskCreateOperation(BaseModel):
+    op: Literal["create"]
+    list_id: int
+    title: str
+    description: Optional[str] = None
+
+
+class TaskUpdateOperation(BaseModel):
+    op: Literal["update"]
+    task_id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+
+
+class TaskMoveOperation(BaseModel):
+    op: Literal["move"]
+    task_id: int
+    list_id: int
+
+
+class TaskDeleteOperation(BaseModel):
+    op: Literal["delete"]
+    task_id: int
+
+
+TaskOperation = Annotated[
+    Union[TaskCreateOperation, TaskUpdateOperation, TaskMoveOperation, TaskDeleteOperation],
+    Field(discriminator="op"),
+]
+
+
+class TaskBatchRequest(BaseModel):
+    operations: list[TaskOperation] = Field(min_length=1, max_length=1000)
+
+
+class TaskOperationResult(BaseModel):
+    index: int
+    op: str
+    task_id: int
+    task: Optional[TaskResponse] = None
+
+
+class TaskBatchResponse(BaseModel):
+    results: list[TaskOperationResult]
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class UserResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    email: str
+    is_active: bool
+    is_confirmed: bool
+
+
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import insert, literal, select, text, tuple_
+from app.config import settings
+from app.database import engine, session_scope
+from app.models.activity import Activity
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT statement; six parameters each stays well inside the
+# drivers' bind parameter limits.
+INSERT_ROWS = 1000
+
+
+def _month_start(moment, offset=0):
+    month = moment.year * 12 + moment.month - 1 + offset
+    return datetime(month // 12, month % 12 + 1, 1)
+
+
+async def ensure_partitions(now=None, months_ahead=1):
+    """Creates the Postgres partitions from this month up to ``months_ahead`` months on."""
+    if engine.dialect.name != "postgresql":
+        return
+    now = now or datetime.utcnow()
+    async with session_scope() as db:
+        for offset in range(months_ahead + 1):
+            start, end = _month_start(now, offset), _month_start(now, offset + 1)
+            await db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS activity_y{start:%Y}m{start:%m} PARTITION OF activity "
+                f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+            ))
+        await db.commit()
+
+
+async def drop_expired_partitions(retention_months, now=None):
+    """Drops the Postgres partitions that ended more than ``retention_months`` months ago.
+
+    Dropping a partition removes its month of history at once, without the
+    dead rows and vacuum work of a DELETE. Other databases keep everything.
+    """
+    if engine.dialect.name != "postgresql" or retention_months <= 0:
+        return []
+    cutoff = _month_start(now or datetime.utcnow(), -retention_months)
+    async with session_scope() as db:
+        names = (await db.scalars(text(
+            "SELECT child.relname FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = 'activity'::regclass AND child.relname ~ '^activity_y[0-9]{4}m[0-9]{2}$'"
+        ))).all()
+        expired = sorted(name for name in names if datetime.strptime(name, "activity_y%Ym%m") < cutoff)
+        for name in expired:
+            await db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        await db.commit()
+    return expired
+
+
+class ActivityLog:
+    """Buffers activity rows in process and writes them in multi-row INSERTs.
+
+    Rows are recorded after the change they describe has committed, so they
+    add nothing to the request's transaction. The buffer is flushed once it
+    holds ``flush_rows`` rows, otherwise every ``flush_seconds``, and at
+    shutdown. Rows still buffered when a worker is killed are lost, and past
+    ``max_rows`` (while the database is unreachable) the oldest are dropped.
+    """
+
+    def __init__(self, flush_rows=500, flush_seconds=1.0, max_rows=50000, retention_months=0):
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.max_rows = max_rows
+        self.retention_months = retention_months
+        self.recorded = 0
+        self.written = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dropped = 0
+        self._rows = []
+        self._wake = asyncio.Event()
+
+    def record(self, board_id, user_id, event_type, data):
+        self._rows.append({
+            "id": uuid.uuid4(), "created_at": datetime.utcnow(),
+            "board_id": board_id, "user_id": user_id, "type": event_type, "data": data,
+        })
+        self.recorded += 1
+        self._trim()
+        if len(self._rows) >= self.flush_rows:
+            self._wake.set()
+
+    def _trim(self):
+        excess = len(self._rows) - self.max_rows
+        if excess > 0:
+            del self._rows[:excess]
+            self.dropped += excess
+
+    async def flush(self):
+        rows, self._rows = self._rows, []
+        if not rows:
+            return 0
+        try:
+            async with session_scope() as db:
+                for start in range(0, len(rows), INSERT_ROWS):
+                    await db.execute(insert(Activity).values(rows[start:start + INSERT_ROWS]))
+                await db.commit()
+        except BaseException:
+            # Put the rows back, ahead of any recorded meanwhile, for the next flush.
+            self.failures += 1
+            self._rows[:0] = rows
+            self._trim()
+            raise
+        self.written += len(rows)
+        self.flushes += 1
+        return len(rows)
+
+    async def run(self):
+        month = None
+        while True:
+            try:
+                now = datetime.utcnow()
+                if (now.year, now.month) != month:
+                    await ensure_partitions(now)
+                    for name in await drop_expired_partitions(self.retention_months, now):
+                        logger.info("Dropped expired activity partition %s", name)
+                    month = (now.year, now.month)
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.flush_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                await self.flush()
+            except Exception:
+                logger.exception("Activity flush failed")
+                await asyncio.sleep(self.flush_seconds)
+
+    def stats(self):
+        return {
+            "pending": len(self._rows),
+            "recorded": self.recorded,
+            "written": self.written,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "dropped": self.dropped,
+        }
+
+
+activity_log = ActivityLog(
+    settings.ACTIVITY_FLUSH_ROWS, settings.ACTIVITY_FLUSH_SECONDS, settings.ACTIVITY_BUFFER_MAX_ROWS, settings.ACTIVITY_RETENTION_MONTHS,
+)
+
+
+async def activity_page(db, board_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """A page of a board's activity, newest first, keyset-paginated on (created_at, id)."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    statement = select(Activity).where(Activity.board_id == board_id)
+    if cursor:
+        created_at, id_ = decode_cursor(cursor, 2)
+        try:
+            after = (literal(datetime.fromisoformat(created_at), Activity.created_at.type), literal(uuid.UUID(id_), Activity.id.type))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        statement = statement.where(tuple_(Activity.created_at, Activity.id) < tuple_(*after))
+    rows = (await db.scalars(
+        statement.order_by(Activity.created_at.desc(), Activity.id.desc()).limit(limit + 1)
+    )).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].created_at.isoformat(), rows[-1].id.hex])
+    return {"items": rows, "next_cursor": next_cursor}
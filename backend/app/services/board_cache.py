@@ -0,0 +1,108 @@
+import importlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from app.config import settings
+
+
+class BoardCacheBackend(ABC):
+    """Storage for serialized /boards/{id}/full payloads.
+
+    Entries are keyed by board id and version. Every change bumps the
+    board's version, so a payload is never served for a version it does not
+    show. A multi-worker deployment plugs in a shared implementation (for
+    example Redis keys named after the board and version) through
+    BOARD_CACHE_BACKEND.
+    """
+
+    @abstractmethod
+    async def get(self, board_id, version):
+        """Returns the payload stored for this version of the board, or None."""
+
+    @abstractmethod
+    async def set(self, board_id, version, payload):
+        """Stores ``payload`` (bytes) as this version of the board."""
+
+    @abstractmethod
+    async def invalidate(self, board_ids):
+        """Drops every stored version of these boards."""
+
+
+class MemoryBackend(BoardCacheBackend):
+    """One payload per board in an LRU dict bounded by total payload bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    async def get(self, board_id, version):
+        entry = self._entries.get(board_id)
+        if entry is None or entry[0] != version:
+            return None
+        self._entries.move_to_end(board_id)
+        return entry[1]
+
+    async def set(self, board_id, version, payload):
+        if len(payload) > self.max_bytes:
+            return
+        current = self._entries.get(board_id)
+        # A lagging read replica may produce an older snapshot; keep the newer one.
+        if current is not None and current[0] > version:
+            return
+        self._remove(board_id)
+        self._entries[board_id] = (version, payload)
+        self.bytes += len(payload)
+        while self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    async def invalidate(self, board_ids):
+        for board_id in board_ids:
+            self._remove(board_id)
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+    def _remove(self, board_id):
+        entry = self._entries.pop(board_id, None)
+        if entry is not None:
+            self.bytes -= len(entry[1])
+
+
+def load_backend(path):
+    """Builds the backend named by ``module:factory``, or an in-process one."""
+    if not path:
+        return MemoryBackend(settings.BOARD_CACHE_MAX_BYTES)
+    module, _, factory = path.partition(":")
+    return getattr(importlib.import_module(module), factory)()
+
+
+class BoardCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, board_id, version):
+        payload = await self.backend.get(board_id, version)
+        if payload is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return payload
+
+    async def set(self, board_id, version, payload):
+        await self.backend.set(board_id, version, payload)
+
+    async def invalidate(self, board_ids):
+        self.invalidations += len(board_ids)
+        await self.backend.invalidate(board_ids)
+
+    def stats(self):
+        backend_stats = self.backend.stats() if hasattr(self.backend, "stats") else {}
+        return {"hits": self.hits, "misses": self.misses, "invalidations": self.invalidations, **backend_stats}
+
+
+board_cache = BoardCache(load_backend(settings.BOARD_CACHE_BACKEND))
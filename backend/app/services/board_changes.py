@@ -0,0 +1,95 @@
+from collections import Counter
+from sqlalchemy import delete, insert, update
+from app.models.board import Board
+from app.models.board_change import BoardChange
+from app.models.list import List
+from app.models.task import Task
+from app.schemas.board import BoardResponse
+from app.schemas.list import ListResponse
+from app.schemas.task import TaskResponse
+from app.services.activity import activity_log
+from app.services.board_cache import board_cache
+from app.services.events import board_events
+
+PENDING_KEY = "board_changes"
+# Housekeeping that changes nothing a user did: published and logged for
+# clients, but left out of the activity feed.
+SYSTEM_EVENTS = {"board.rebalanced", "list.rebalanced"}
+# Set by verify_token on the request's session: the user the changes are attributed to.
+ACTOR_KEY = "actor_id"
+
+SCHEMAS = {
+    Board: BoardResponse,
+    List: ListResponse,
+    Task: TaskResponse,
+}
+
+
+def record_change(db, board_id, event_type, data):
+    """Queues a change event on the session until commit_changes() commits it.
+
+    ``data`` is a mapping, or a board, list or task that is serialized once
+    it has been flushed so generated ids are present.
+    """
+    db.info.setdefault(PENDING_KEY, []).append((board_id, event_type, data))
+
+
+def _serialize(data):
+    schema = SCHEMAS.get(type(data))
+    return schema.model_validate(data).model_dump() if schema else data
+
+
+async def _bump_versions(db, counts):
+    # One increment per change, so every event gets its own version. Boards
+    # are locked in id order to keep concurrent cross-board moves from
+    # deadlocking. A board deleted in this transaction has no version left.
+    versions = {}
+    for board_id in sorted(counts):
+        version = await db.scalar(
+            update(Board).where(Board.id == board_id).values(version=Board.version + counts[board_id])
+            .returning(Board.version)
+        )
+        if version is not None:
+            versions[board_id] = version - counts[board_id]
+    return versions
+
+
+async def commit_changes(db):
+    """Commits the session, then publishes the changes recorded on it.
+
+    Each change bumps its board's version and is appended to the
+    board_changes log under that version, all in the same transaction.
+    Events are only published, cached snapshots of the boards dropped and
+    activity recorded once the commit succeeded, so no one ever sees a
+    change that was rolled back.
+    """
+    pending = db.info.pop(PENDING_KEY, [])
+    events = []
+    if pending:
+        await db.flush()
+        counts = Counter(board_id for board_id, _, _ in pending)
+        versions = await _bump_versions(db, counts)
+        log = []
+        for board_id, event_type, data in pending:
+            version = versions.get(board_id)
+            if version is not None:
+                version = versions[board_id] = version + 1
+            event = {"type": event_type, "board_id": board_id, "version": version, "data": _serialize(data)}
+            events.append((board_id, event))
+            if version is not None:
+                log.append({"board_id": board_id, "seq": version, "type": event_type, "data": event["data"]})
+        if log:
+            await db.execute(insert(BoardChange), log)
+        deleted = counts.keys() - versions.keys()
+        if deleted:
+            await db.execute(delete(BoardChange).where(BoardChange.board_id.in_(deleted)))
+    await db.commit()
+    if pending:
+        await board_cache.invalidate({board_id for board_id, _, _ in pending})
+    actor_id = db.info.get(ACTOR_KEY)
+    # A deleted board's history is being purged; nothing more is added to it.
+    gone = {board_id for board_id, event in events if event["version"] is None or event["type"] == "board.deleted"}
+    for board_id, event in events:
+        board_events.publish(board_id, event)
+        if board_id not in gone and event["type"] not in SYSTEM_EVENTS:
+            activity_log.record(board_id, actor_id, event["type"], event["data"])
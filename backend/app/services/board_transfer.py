@@ -0,0 +1,294 @@
+"""NDJSON export and import of boards with their lists and tasks.
+
+An export is one JSON object per line: a header, then every board, then
+their lists, then their tasks, each tagged with a ``type``. Ids are the
+source database's; an import gives every row a new id and remaps the
+references, so a file can be loaded into any database, any number of times.
+
+    python -m app.services.board_transfer export --email ann@example.com [--board 3] > boards.ndjson
+    python -m app.services.board_transfer import --email ann@example.com boards.ndjson
+"""
+import argparse
+import asyncio
+import io
+import sys
+import orjson
+from fastapi import HTTPException
+from sqlalchemy import insert, select, text
+from app.auth.access import OWNER, membership
+from app.config import settings
+from app.database import engine, session_scope
+from app.models.board import Board
+from app.models.board_member import BoardMember
+from app.models.list import List
+from app.models.task import Task
+from app.models.user import User
+from app.services.ordering import is_valid_key
+
+FORMAT = 1
+EXPORT_CHUNK_ROWS = 1000
+IMPORT_BATCH_ROWS = 5000
+
+
+def _export_statements(user, board_id=None):
+    boards = select(Board.id, Board.title, Board.background_color).join(BoardMember, membership(Board.id, user))
+    lists = select(List.id, List.board_id, List.title, List.position).join(BoardMember, membership(List.board_id, user))
+    tasks = (
+        select(Task.id, Task.list_id, Task.title, Task.description, Task.position)
+        .join(List, Task.list_id == List.id).join(BoardMember, membership(List.board_id, user))
+    )
+    if board_id is not None:
+        boards = boards.where(Board.id == board_id)
+        lists = lists.where(List.board_id == board_id)
+        tasks = tasks.where(List.board_id == board_id)
+    return (
+        ("board", boards.order_by(Board.id)),
+        ("list", lists.order_by(List.board_id, List.position, List.id)),
+        ("task", tasks.order_by(Task.list_id, Task.position, Task.id)),
+    )
+
+
+async def stream_export(user, board_id=None, read_only=True):
+    """Yields the export as NDJSON chunks, one chunk per fetched partition.
+
+    Rows come through a server-side cursor ``EXPORT_CHUNK_ROWS`` at a time,
+    so memory stays flat however large the boards are. The generator opens
+    its own session because it outlives the request's.
+    """
+    yield orjson.dumps({"type": "export", "format": FORMAT}) + b"\n"
+    async with session_scope(read_only=read_only) as db:
+        for record_type, statement in _export_statements(user, board_id):
+            result = await db.stream(statement.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+            async for rows in result.partitions():
+                yield b"".join(orjson.dumps({"type": record_type, **row._asdict()}) + b"\n" for row in rows)
+
+
+async def ndjson_lines(chunks):
+    """Splits an async stream of byte chunks into (line number, line) pairs."""
+    number, pending = 0, b""
+    async for chunk in chunks:
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            number += 1
+            yield number, line
+    if pending:
+        yield number + 1, pending
+
+
+def _copy_text(rows):
+    """Renders rows in COPY's text format, for drivers that take a file."""
+    def value(item):
+        if item is None:
+            return "\\N"
+        if isinstance(item, bool):
+            return "t" if item else "f"
+        return str(item).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    return io.StringIO("".join("\t".join(map(value, row)) + "\n" for row in rows))
+
+
+def _copy_rows_sync(session, sql, rows):
+    driver_connection = session.connection().connection.driver_connection
+    with driver_connection.cursor() as cursor:
+        if hasattr(cursor, "copy"):
+            with cursor.copy(sql) as copy:
+                for row in rows:
+                    copy.write_row(row)
+        else:
+            cursor.copy_expert(sql, _copy_text(rows))
+
+
+async def _copy(db, model, rows):
+    columns = list(rows[0])
+    sql = f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN"
+    values = [tuple(row[column] for column in columns) for row in rows]
+    if settings.DATABASE_MODE != "async":
+        await db.run_sync(_copy_rows_sync, sql, values)
+        return
+    raw_connection = await (await db.connection()).get_raw_connection()
+    async with raw_connection.driver_connection.cursor() as cursor:
+        async with cursor.copy(sql) as copy:
+            for row in values:
+                await copy.write_row(row)
+
+
+async def _insert(db, model, rows):
+    if engine.dialect.name == "postgresql":
+        await _copy(db, model, rows)
+    else:
+        await db.execute(insert(model), rows)
+
+
+async def _insert_returning_ids(db, model, rows):
+    """Inserts rows and returns their new ids in row order.
+
+    On Postgres the ids are drawn from the table's sequence up front and the
+    rows go in by COPY; elsewhere a batched INSERT ... RETURNING is used.
+    """
+    if engine.dialect.name != "postgresql":
+        return (await db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows)).all()
+    ids = (await db.scalars(
+        text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+        {"table": model.__tablename__, "count": len(rows)},
+    )).all()
+    await _copy(db, model, [{"id": id_, **row} for id_, row in zip(ids, rows)])
+    return ids
+
+
+class _Importer:
+    def __init__(self, db, owner_id):
+        self.db = db
+        self.owner_id = owner_id
+        self.board_ids = {}
+        self.list_ids = {}
+        self.counts = {"board": 0, "list": 0, "task": 0}
+
+    @staticmethod
+    def _reference(ids, record, field, number):
+        try:
+            return ids[record[field]]
+        except KeyError:
+            raise HTTPException(status_code=400, detail=f"Line {number}: unknown {field} {record.get(field)!r}")
+
+    @staticmethod
+    def _text(record, field, number, required=False):
+        value = record.get(field)
+        if not isinstance(value, str) and (required or value is not None):
+            raise HTTPException(status_code=400, detail=f"Line {number}: {field} must be a string")
+        return value
+
+    @staticmethod
+    def _position(record, number):
+        # Positions are kept as exported, so they must be keys that new
+        # items can later be placed around.
+        position = record.get("position")
+        if not is_valid_key(position):
+            raise HTTPException(status_code=400, detail=f"Line {number}: invalid position {position!r}")
+        return position
+
+    async def load_boards(self, records):
+        rows = [
+            {
+                "title": self._text(record, "title", number, required=True), "background_color": self._text(record, "background_color", number),
+                "owner_id": self.owner_id, "version": 0, "is_template": False,
+            }
+            for number, record in records
+        ]
+        ids = await _insert_returning_ids(self.db, Board, rows)
+        await _insert(self.db, BoardMember, [{"board_id": id_, "user_id": self.owner_id, "role": OWNER} for id_ in ids])
+        self.board_ids.update((record["id"], id_) for (_, record), id_ in zip(records, ids))
+
+    async def load_lists(self, records):
+        rows = [
+            {
+                "title": self._text(record, "title", number, required=True),
+                "board_id": self._reference(self.board_ids, record, "board_id", number), "position": self._position(record, number),
+            }
+            for number, record in records
+        ]
+        ids = await _insert_returning_ids(self.db, List, rows)
+        self.list_ids.update((record["id"], id_) for (_, record), id_ in zip(records, ids))
+
+    async def load_tasks(self, records):
+        await _insert(self.db, Task, [
+            {
+                "title": self._text(record, "title", number, required=True), "description": self._text(record, "description", number),
+                "list_id": self._reference(self.list_ids, record, "list_id", number), "position": self._position(record, number),
+            }
+            for number, record in records
+        ])
+
+    async def flush(self, record_type, records):
+        if not records:
+            return
+        loader = {"board": self.load_boards, "list": self.load_lists, "task": self.load_tasks}[record_type]
+        try:
+            await loader(records)
+        except KeyError as error:
+            raise HTTPException(status_code=400, detail=f"Missing field {error} in a {record_type} record")
+        self.counts[record_type] += len(records)
+
+
+async def import_records(db, owner_id, lines):
+    """Loads an export into boards owned by ``owner_id``; the caller commits.
+
+    ``lines`` is an async iterable of (line number, line) pairs. Records are
+    loaded in batches of ``IMPORT_BATCH_ROWS`` as they are read; a board or
+    list must come before the records that reference it, as in an export.
+    Only the old-to-new board and list id maps are kept in memory.
+    """
+    importer = _Importer(db, owner_id)
+    batch_type, batch = None, []
+    async for number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            raise HTTPException(status_code=400, detail=f"Line {number}: invalid JSON")
+        record_type = record.get("type") if isinstance(record, dict) else None
+        if record_type == "export":
+            if record.get("format") != FORMAT:
+                raise HTTPException(status_code=400, detail=f"Line {number}: unsupported export format")
+            continue
+        if record_type not in importer.counts:
+            raise HTTPException(status_code=400, detail=f"Line {number}: unknown record type")
+        if record_type != batch_type or len(batch) >= IMPORT_BATCH_ROWS:
+            await importer.flush(batch_type, batch)
+            batch_type, batch = record_type, []
+        batch.append((number, record))
+    await importer.flush(batch_type, batch)
+    return {
+        "boards": importer.counts["board"],
+        "lists": importer.counts["list"],
+        "tasks": importer.counts["task"],
+        "board_ids": list(importer.board_ids.values()),
+    }
+
+
+async def _user(db, email):
+    user = await db.scalar(select(User).where(User.email == email))
+    if user is None:
+        sys.exit(f"No user with email {email}")
+    return user
+
+
+async def _export_command(args):
+    async with session_scope() as db:
+        user = await _user(db, args.email)
+    async for chunk in stream_export(user, args.board):
+        sys.stdout.buffer.write(chunk)
+    sys.stdout.buffer.flush()
+
+
+async def _file_chunks(file):
+    while chunk := await asyncio.to_thread(file.read, 1 << 16):
+        yield chunk
+
+
+async def _import_command(args):
+    async with session_scope() as db:
+        user = await _user(db, args.email)
+        with open(args.file, "rb") as file:
+            try:
+                result = await import_records(db, user.id, ndjson_lines(_file_chunks(file)))
+            except HTTPException as error:
+                sys.exit(error.detail)
+        await db.commit()
+    print(f"Imported {result['boards']} boards, {result['lists']} lists and {result['tasks']} tasks")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="write a user's boards to stdout")
+    export_parser.add_argument("--email", required=True)
+    export_parser.add_argument("--board", type=int, help="export this board only")
+    import_parser = commands.add_parser("import", help="load an export into a user's account")
+    import_parser.add_argument("--email", required=True)
+    import_parser.add_argument("file")
+    args = parser.parse_args()
+    asyncio.run(_export_command(args) if args.command == "export" else _import_command(args))
+
+
+if __name__ == "__main__":
+    main()
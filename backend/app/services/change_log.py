@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select, tuple_
+from app.database import session_scope
+from app.models.board_change import BoardChange
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANGES_LIMIT = 500
+MAX_CHANGES_LIMIT = 1000
+COMPACTION_BATCH = 5000
+
+
+async def changes_since(db, board_id, version, since, limit=DEFAULT_CHANGES_LIMIT):
+    """Returns the logged changes after ``since`` up to the board's current version.
+
+    Sequence numbers are the board versions the changes produced, so a log
+    that does not continue at ``since + 1`` has been compacted past it and
+    the client has to resync from a full snapshot.
+    """
+    limit = max(1, min(limit, MAX_CHANGES_LIMIT))
+    resync = {"board_id": board_id, "version": version, "resync": True, "changes": [], "next_since": version, "has_more": False}
+    if since > version:
+        return resync
+    if since == version:
+        return {**resync, "resync": False}
+    changes = (await db.scalars(
+        select(BoardChange).where(BoardChange.board_id == board_id, BoardChange.seq > since)
+        .order_by(BoardChange.seq).limit(limit + 1)
+    )).all()
+    if not changes or changes[0].seq != since + 1:
+        return resync
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    return {
+        "board_id": board_id,
+        "version": version,
+        "resync": False,
+        "changes": changes,
+        "next_since": changes[-1].seq,
+        "has_more": has_more,
+    }
+
+
+async def compact_change_log(retention, batch_size=COMPACTION_BATCH):
+    """Deletes log entries older than ``retention``, one short transaction per batch."""
+    cutoff = datetime.utcnow() - retention
+    deleted = 0
+    while True:
+        async with session_scope() as db:
+            batch = (await db.execute(
+                select(BoardChange.board_id, BoardChange.seq).where(BoardChange.created_at < cutoff).limit(batch_size)
+            )).all()
+            if batch:
+                await db.execute(
+                    delete(BoardChange).where(tuple_(BoardChange.board_id, BoardChange.seq).in_(batch))
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        deleted += len(batch)
+        if len(batch) < batch_size:
+            return deleted
+
+
+async def run_compaction(retention_hours, interval_seconds):
+    retention = timedelta(hours=retention_hours)
+    while True:
+        try:
+            await compact_change_log(retention)
+        except Exception:
+            logger.exception("Change log compaction failed")
+        await asyncio.sleep(interval_seconds)
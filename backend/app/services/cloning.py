@@ -0,0 +1,46 @@
+from sqlalchemy import case, func, insert, literal, select
+from app.auth.access import OWNER
+from app.models.board import Board
+from app.models.board_member import BoardMember
+from app.models.list import List
+from app.models.task import Task
+
+
+async def copy_board(db, source_id, owner_id, title=None):
+    """Copies a board with its lists and tasks in set-based statements.
+
+    The board and the tasks are copied by INSERT ... SELECT. The lists go in
+    as one multi-row INSERT whose RETURNING ids come back in parameter
+    order, which gives the old-to-new list id map the task copy needs.
+    SQLAlchemy sends that INSERT row by row on SQLite, which cannot promise
+    the order; the task copy stays one statement however many cards there
+    are. The caller commits.
+    """
+    board_id = await db.scalar(
+        insert(Board).from_select(
+            ["title", "background_color", "owner_id", "version", "is_template"],
+            select(
+                func.coalesce(literal(title, Board.title.type), Board.title), Board.background_color,
+                literal(owner_id), literal(0), literal(False),
+            ).where(Board.id == source_id),
+        ).returning(Board.id)
+    )
+    await db.execute(insert(BoardMember).values(board_id=board_id, user_id=owner_id, role=OWNER))
+
+    lists = (await db.execute(select(List.id, List.title, List.position).where(List.board_id == source_id))).all()
+    if not lists:
+        return board_id
+    new_ids = (await db.scalars(
+        insert(List).returning(List.id, sort_by_parameter_order=True),
+        [{"title": list_title, "board_id": board_id, "position": position} for _, list_title, position in lists],
+    )).all()
+    list_ids = {old_id: new_id for (old_id, _, _), new_id in zip(lists, new_ids)}
+
+    await db.execute(
+        insert(Task).from_select(
+            ["title", "description", "list_id", "position"],
+            select(Task.title, Task.description, case(list_ids, value=Task.list_id), Task.position)
+            .where(Task.list_id.in_(list_ids)),
+        )
+    )
+    return board_id
@@ -0,0 +1,31 @@
+from fastapi import HTTPException
+
+# Clients may keep a copy but must revalidate it on every use.
+CACHE_CONTROL = "private, no-cache"
+
+
+def board_etag(board_id, version):
+    return f'"{board_id}.{version}"'
+
+
+def _matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    # If-None-Match uses weak comparison, so a W/ prefix still matches.
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def conditional_get(request, response, board_id, version):
+    """Tags ``response`` with the board's ETag, or raises 304 if the client already has it.
+
+    The version is read before the payload, so a body is never older than
+    the tag it is sent with. Returns the headers, for routes that build
+    their own response.
+    """
+    etag = board_etag(board_id, version)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return headers
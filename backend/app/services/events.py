@@ -0,0 +1,71 @@
+import asyncio
+from contextlib import contextmanager
+from app.config import settings
+
+# Sent in place of the dropped events when a subscriber falls behind; the
+# client refetches the board instead of replaying a gap it cannot see.
+RESYNC = {"type": "resync"}
+
+
+class Subscription:
+    def __init__(self, board_id, max_queued):
+        self.board_id = board_id
+        self.queue = asyncio.Queue(max_queued)
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            # Never wait on a slow reader: drop its backlog and tell it to resync.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            return False
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class BoardEvents:
+    """In-process pub/sub of board change events.
+
+    publish() only enqueues onto each subscriber's bounded queue, so fan-out
+    costs the same however slowly the WebSockets behind the queues drain.
+    """
+
+    def __init__(self, max_queued):
+        self.max_queued = max_queued
+        self._subscribers = {}
+        self.published = 0
+        self.resyncs = 0
+
+    @contextmanager
+    def subscribe(self, board_id):
+        subscription = Subscription(board_id, self.max_queued)
+        self._subscribers.setdefault(board_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscribers = self._subscribers.get(board_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[board_id]
+
+    def publish(self, board_id, event):
+        self.published += 1
+        for subscription in self._subscribers.get(board_id, ()):
+            if not subscription.offer(event):
+                self.resyncs += 1
+
+    def stats(self):
+        return {
+            "boards": len(self._subscribers),
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "published": self.published,
+            "resyncs": self.resyncs,
+        }
+
+
+board_events = BoardEvents(settings.EVENT_QUEUE_SIZE)
@@ -0,0 +1,261 @@
+"""In-process Prometheus metrics: a small registry, the request middleware,
+engine and pool instrumentation, and the text exposition format."""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _quote(value):
+    return '"' + _escape(value) + '"'
+
+
+def _labels(names, values, extra=""):
+    pairs = [f"{name}={_quote(value)}" for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def add(self, amount, labels=()):
+        self.inc(labels, amount)
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            series = [(labels, (list(counts), total, count)) for labels, (counts, total, count) in self._series.items()]
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, 'le=' + _quote(bound))} {cumulative}"
+            yield f"{self.name}_bucket{_labels(self.labelnames, labels, 'le=' + _quote('+Inf'))} {count}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {total}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {count}"
+
+
+class StatsCollector:
+    """Exposes every number in a component's stats() dict as a gauge at scrape time."""
+
+    type = "gauge"
+
+    def __init__(self, prefix, documentation, stats):
+        self.prefix = prefix
+        self.documentation = documentation
+        self.stats = stats
+
+    def families(self):
+        for key, value in self.stats().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield f"{self.prefix}_{key}", [f"{self.prefix}_{key} {value}"]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            if isinstance(metric, StatsCollector):
+                for name, samples in metric.families():
+                    lines += [f"# HELP {name} {metric.documentation}", f"# TYPE {name} gauge", *samples]
+                continue
+            lines += [f"# HELP {metric.name} {metric.documentation}", f"# TYPE {metric.name} {metric.type}"]
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"),
+))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"),
+))
+http_in_progress = registry.register(Gauge("http_requests_in_progress", "HTTP requests currently being served."))
+db_statements = registry.register(Counter("db_statements_total", "SQL statements executed by operation.", ("operation",)))
+db_statement_duration = registry.register(Histogram("db_statement_duration_seconds", "SQL statement execution time."))
+db_statements_per_request = registry.register(Histogram(
+    "db_statements_per_request", "SQL statements issued while serving one request.", ("route",), COUNT_BUCKETS,
+))
+db_seconds_per_request = registry.register(Histogram(
+    "db_seconds_per_request", "Time spent in SQL statements while serving one request.", ("route",),
+))
+pool_checkout_duration = registry.register(Histogram(
+    "db_pool_checkout_seconds", "Time to obtain a pooled connection, including waits and new connects.", ("pool",),
+))
+pool_checkout_timeouts = registry.register(Counter(
+    "db_pool_checkout_timeouts_total", "Connection checkouts that timed out waiting on the pool.", ("pool",),
+))
+
+
+class RequestDbCost:
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# Set by the middleware for the duration of a request. The object is
+# mutated in place, so statements run in the threadpool or in SQLAlchemy's
+# greenlets still add to the request that issued them.
+request_db_cost = ContextVar("request_db_cost", default=None)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status and DB cost per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        cost = RequestDbCost()
+        token = request_db_cost.set(cost)
+        http_in_progress.add(1)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_in_progress.add(-1)
+            request_db_cost.reset(token)
+            # The matched route's template keeps label cardinality bounded.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            http_requests.inc((method, route, str(status_code)))
+            http_request_duration.observe(elapsed, (method, route))
+            db_statements_per_request.observe(cost.statements, (route,))
+            db_seconds_per_request.observe(cost.seconds, (route,))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+    db_statements.inc((operation,))
+    db_statement_duration.observe(elapsed)
+    cost = request_db_cost.get()
+    if cost is not None:
+        cost.statements += 1
+        cost.seconds += elapsed
+
+
+def instrument_engine(engine, name):
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    if isinstance(sync_engine.pool, QueuePool):
+        sync_engine.pool.metrics_name = name
+
+        def pool_stats():
+            # dispose() swaps in a new pool, so look it up at every scrape.
+            pool = sync_engine.pool
+            return {"size": pool.size(), "checked_out": pool.checkedout(), "overflow": pool.overflow()}
+
+        registry.register(StatsCollector(f"db_pool_{name}", "Connection pool state.", pool_stats))
+
+
+class _InstrumentedPoolMixin:
+    metrics_name = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_checkout_timeouts.inc((self.metrics_name,))
+            raise
+        finally:
+            pool_checkout_duration.observe(time.perf_counter() - started, (self.metrics_name,))
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
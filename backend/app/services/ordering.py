@@ -0,0 +1,126 @@
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+from app.database import session_scope
+from app.services.board_changes import commit_changes, record_change
+
+# Position keys are base-36 strings compared lexicographically. Lowercase
+# digits and letters sort the same under byte order and common locale
+# collations, so ORDER BY position works without a special collation.
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+# Keys are read as base-36 fractions and never end in "0", which keeps
+# lexicographic order identical to numeric order. Appends and prepends step
+# the first HEAD_WIDTH digits; inserts between two keys add digits after them.
+HEAD_WIDTH = 6
+HEAD_STEP = BASE ** 3
+HEAD_SPAN = BASE ** HEAD_WIDTH
+REBALANCE_LENGTH = 24
+
+
+def _head(value):
+    digits = []
+    for _ in range(HEAD_WIDTH):
+        value, digit = divmod(value, BASE)
+        digits.append(DIGITS[digit])
+    return "".join(reversed(digits)).rstrip("0")
+
+
+def _head_value(key):
+    return int(key[:HEAD_WIDTH].ljust(HEAD_WIDTH, "0"), BASE)
+
+
+def _midpoint(a, b):
+    # a < b, read as base-36 fractions; "" is 0 and None is 1.
+    if b is not None:
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else "0") == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    low = DIGITS.index(a[0]) if a else 0
+    high = DIGITS.index(b[0]) if b is not None else BASE
+    if high - low > 1:
+        return DIGITS[(low + high) // 2]
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[low] + _midpoint(a[1:], None)
+
+
+def key_between(a=None, b=None):
+    """Returns a key that sorts strictly between ``a`` and ``b`` (either may be None)."""
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"{a!r} does not sort before {b!r}")
+    if a is None and b is None:
+        return _head(HEAD_SPAN // 2)
+    if b is None:
+        head = _head_value(a) + HEAD_STEP
+        return _head(head) if head < HEAD_SPAN else _midpoint(a, None)
+    if a is None:
+        head = _head_value(b) - HEAD_STEP
+        return _head(head) if head > 0 else _midpoint("", b)
+    return _midpoint(a, b)
+
+
+def spaced_keys(count):
+    step = min(HEAD_STEP, HEAD_SPAN // (count + 1))
+    start = max(step, HEAD_SPAN // 2 - step * (count // 2))
+    return [_head(start + step * index) for index in range(count)]
+
+
+def is_valid_key(key):
+    """True for a key that key_between() can place items around."""
+    return isinstance(key, str) and key != "" and not key.endswith("0") and all(digit in DIGITS for digit in key)
+
+
+def needs_rebalance(key):
+    return len(key) > REBALANCE_LENGTH
+
+
+async def position_between(db, model, parent_column, parent_id, after_id=None, before_id=None, moving_id=None):
+    """Computes a position for an item placed after ``after_id`` and before ``before_id``.
+
+    With no neighbours the item goes to the end. A missing neighbour is looked
+    up with a single probe on the (parent, position) index, so no sibling is
+    ever renumbered.
+    """
+    siblings = select(model.position).where(parent_column == parent_id)
+    if moving_id is not None:
+        siblings = siblings.where(model.id != moving_id)
+
+    async def neighbour_position(neighbour_id):
+        if neighbour_id == moving_id:
+            raise HTTPException(status_code=400, detail="An item cannot be its own neighbour")
+        position = await db.scalar(siblings.where(model.id == neighbour_id))
+        if position is None:
+            raise HTTPException(status_code=404, detail="Neighbour not found")
+        return position
+
+    after = await neighbour_position(after_id) if after_id is not None else None
+    before = await neighbour_position(before_id) if before_id is not None else None
+    if after_id is None and before_id is None:
+        after = await db.scalar(siblings.with_only_columns(func.max(model.position)))
+    elif before_id is None:
+        before = await db.scalar(siblings.with_only_columns(func.min(model.position)).where(model.position > after))
+    elif after_id is None:
+        after = await db.scalar(siblings.with_only_columns(func.max(model.position)).where(model.position < before))
+    if after is not None and before is not None and after >= before:
+        raise HTTPException(status_code=409, detail="Neighbours are not adjacent")
+    return key_between(after, before)
+
+
+async def rebalance(model, parent_column, parent_id, board_id):
+    """Rewrites the positions under one parent as short, evenly spaced keys.
+
+    The event names only the parent, as "list.rebalanced" or
+    "board.rebalanced"; clients refetch its items rather than receive every
+    new key.
+    """
+    async with session_scope() as db:
+        ids = (await db.scalars(
+            select(model.id).where(parent_column == parent_id).order_by(model.position, model.id).with_for_update()
+        )).all()
+        if ids:
+            await db.execute(update(model), [{"id": id_, "position": key} for id_, key in zip(ids, spaced_keys(len(ids)))])
+            parent = parent_column.key.removesuffix("_id")
+            record_change(db, board_id, f"{parent}.rebalanced", {parent_column.key: parent_id})
+        await commit_changes(db)
@@ -0,0 +1,200 @@
+"""Transactional outbox for outbound email and the worker that drains it.
+
+Request handlers only insert outbox rows, in the same transaction as the
+change that triggers the mail. The sender runs as its own process:
+
+    python -m app.services.outbox
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+import aiosmtplib
+from sqlalchemy import select, update
+from app.config import settings
+from app.database import session_scope
+from app.models.outbox import FAILED, PENDING, SENT, OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+# A claimed batch is leased for this long. If the sender dies mid-batch the
+# messages become due again afterwards, so delivery is at-least-once.
+CLAIM_LEASE = timedelta(minutes=5)
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+
+
+def enqueue_email(db, recipient, subject, body):
+    """Adds a message to the outbox as part of the caller's transaction."""
+    db.add(OutboxMessage(recipient=recipient, subject=subject, body=body))
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempts - 1)))
+
+
+def is_permanent(error):
+    # 5xx replies (unknown mailbox, rejected content) will not succeed on retry.
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(refused.code >= 500 for refused in error.recipients)
+    return isinstance(error, aiosmtplib.SMTPResponseException) and error.code >= 500
+
+
+class SMTPPool:
+    """A fixed number of long-lived SMTP connections shared by concurrent sends.
+
+    Connections are opened on first use and kept open between batches. A
+    connection that errors is closed and replaced on its next use.
+    """
+
+    def __init__(self, size, **options):
+        self.options = options
+        self.connects = 0
+        self._idle = asyncio.Queue()
+        for _ in range(size):
+            self._idle.put_nowait(None)
+
+    async def _connect(self):
+        client = aiosmtplib.SMTP(**self.options)
+        await client.connect()
+        self.connects += 1
+        return client
+
+    @staticmethod
+    def _discard(client):
+        if client is not None:
+            client.close()
+        return None
+
+    async def send(self, message):
+        client = await self._idle.get()
+        try:
+            # An idle connection may have been dropped by the server, so a
+            # disconnect gets one retry on a fresh connection.
+            for retry in (True, False):
+                if client is None or not client.is_connected:
+                    client = await self._connect()
+                try:
+                    await client.send_message(message)
+                    return
+                except aiosmtplib.SMTPServerDisconnected:
+                    client = self._discard(client)
+                    if not retry:
+                        raise
+        except (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused):
+            # The server refused this message; the connection is still usable.
+            raise
+        except Exception:
+            client = self._discard(client)
+            raise
+        finally:
+            self._idle.put_nowait(client)
+
+    async def close(self):
+        while not self._idle.empty():
+            client = self._idle.get_nowait()
+            if client is not None and client.is_connected:
+                try:
+                    await client.quit()
+                except aiosmtplib.SMTPException:
+                    client.close()
+
+
+def smtp_pool():
+    return SMTPPool(
+        settings.OUTBOX_SMTP_CONNECTIONS,
+        hostname=settings.MAIL_SERVER,
+        port=settings.MAIL_PORT,
+        username=settings.MAIL_USERNAME or None,
+        password=settings.MAIL_PASSWORD or None,
+        use_tls=settings.MAIL_SSL_TLS,
+        start_tls=settings.MAIL_STARTTLS,
+    )
+
+
+def build_message(recipient, subject, body):
+    message = EmailMessage()
+    message["From"] = settings.MAIL_FROM
+    message["To"] = recipient
+    message["Subject"] = subject
+    message.set_content(body, subtype="html")
+    return message
+
+
+async def claim_batch(size):
+    """Leases up to ``size`` due messages and returns them as plain tuples.
+
+    SKIP LOCKED lets several senders claim disjoint batches concurrently.
+    """
+    now = datetime.utcnow()
+    async with session_scope() as db:
+        messages = (await db.scalars(
+            select(OutboxMessage).where(OutboxMessage.status == PENDING, OutboxMessage.next_attempt_at <= now)
+            .order_by(OutboxMessage.next_attempt_at).limit(size).with_for_update(skip_locked=True)
+        )).all()
+        claimed = []
+        for message in messages:
+            message.attempts += 1
+            message.next_attempt_at = now + CLAIM_LEASE
+            claimed.append((message.id, message.recipient, message.subject, message.body, message.attempts))
+        await db.commit()
+    return claimed
+
+
+async def record_results(claimed, errors, max_attempts):
+    now = datetime.utcnow()
+    sent_ids, retries, failures = [], [], []
+    for (id_, _, _, _, attempts), error in zip(claimed, errors):
+        if error is None:
+            sent_ids.append(id_)
+        elif is_permanent(error) or attempts >= max_attempts:
+            failures.append({"id": id_, "status": FAILED, "last_error": str(error)[:1000]})
+        else:
+            retries.append({"id": id_, "next_attempt_at": now + backoff(attempts), "last_error": str(error)[:1000]})
+    async with session_scope() as db:
+        if sent_ids:
+            await db.execute(
+                update(OutboxMessage).where(OutboxMessage.id.in_(sent_ids)).values(status=SENT, sent_at=now, last_error=None)
+                .execution_options(synchronize_session=False)
+            )
+        for rows in (retries, failures):
+            if rows:
+                await db.execute(update(OutboxMessage), rows)
+        await db.commit()
+    return len(sent_ids), len(retries), len(failures)
+
+
+async def process_batch(pool, batch_size, max_attempts):
+    """Sends one claimed batch over the pool; returns the number of messages claimed."""
+    claimed = await claim_batch(batch_size)
+    if not claimed:
+        return 0
+    results = await asyncio.gather(
+        *(pool.send(build_message(recipient, subject, body)) for _, recipient, subject, body, _ in claimed),
+        return_exceptions=True,
+    )
+    errors = [result if isinstance(result, BaseException) else None for result in results]
+    sent, retried, failed = await record_results(claimed, errors, max_attempts)
+    logger.info("Outbox batch: %d sent, %d to retry, %d failed", sent, retried, failed)
+    return len(claimed)
+
+
+async def run_sender(batch_size, max_attempts, poll_seconds):
+    pool = smtp_pool()
+    try:
+        while True:
+            try:
+                claimed = await process_batch(pool, batch_size, max_attempts)
+            except Exception:
+                logger.exception("Outbox batch failed")
+                claimed = 0
+            # A full batch suggests a backlog, so keep going without sleeping.
+            if claimed < batch_size:
+                await asyncio.sleep(poll_seconds)
+    finally:
+        await pool.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_sender(settings.OUTBOX_BATCH_SIZE, settings.OUTBOX_MAX_ATTEMPTS, settings.OUTBOX_POLL_SECONDS))
@@ -0,0 +1,41 @@
+import base64
+import json
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values):
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor, size):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+async def paginate(db, statement, order_by, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Keyset-paginate ``statement`` over the unique column tuple ``order_by``.
+
+    The cursor holds the sort key of the last row served, so every page is a
+    range scan starting right after it rather than an OFFSET walk.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor:
+        values = decode_cursor(cursor, len(order_by))
+        statement = statement.where(tuple_(*order_by) > tuple_(*values))
+    rows = (await db.scalars(statement.order_by(*order_by).limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(getattr(rows[-1], column.key) for column in order_by)
+    return {"items": rows, "next_cursor": next_cursor}
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from datetime import datetime
+from sqlalchemy import delete, select, tuple_, update
+from app.database import session_scope
+from app.models.activity import Activity
+from app.models.board import Board, board_user_association
+from app.models.board_change import BoardChange
+from app.models.board_member import BoardMember
+from app.models.list import List
+from app.models.task import Task
+from app.services.activity import activity_log
+from app.services.board_changes import record_change
+
+logger = logging.getLogger(__name__)
+
+
+async def is_large_board(db, board_id, threshold):
+    """True when the board has more than ``threshold`` tasks, counting no further."""
+    over = await db.scalar(
+        select(Task.id).join(List).where(List.board_id == board_id).offset(threshold).limit(1)
+    )
+    return over is not None
+
+
+async def soft_delete_board(db, board_id):
+    """Hides a board at once and leaves its rows to purge_deleted_boards().
+
+    Every access check joins board_members, so dropping the memberships is
+    what takes the board out of listings, search and direct access. The
+    caller commits with commit_changes().
+    """
+    await db.execute(update(Board).where(Board.id == board_id).values(deleted_at=datetime.utcnow()))
+    await db.execute(delete(BoardMember).where(BoardMember.board_id == board_id))
+    await db.execute(board_user_association.delete().where(board_user_association.c.board_id == board_id))
+    record_change(db, board_id, "board.deleted", {"id": board_id})
+
+
+async def _delete_batch(model, where, batch_size):
+    """Deletes up to ``batch_size`` rows of ``model`` in one short transaction."""
+    async with session_scope() as db:
+        ids = (await db.scalars(select(model.id).where(*where).limit(batch_size))).all()
+        if ids:
+            await db.execute(delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False))
+            await db.commit()
+    return len(ids)
+
+
+async def _delete_log_batch(board_id, batch_size):
+    async with session_scope() as db:
+        seqs = (await db.scalars(
+            select(BoardChange.seq).where(BoardChange.board_id == board_id).order_by(BoardChange.seq).limit(batch_size)
+        )).all()
+        if seqs:
+            await db.execute(delete(BoardChange).where(BoardChange.board_id == board_id, BoardChange.seq <= seqs[-1]))
+            await db.commit()
+    return len(seqs)
+
+
+async def _delete_activity_batch(board_id, batch_size):
+    async with session_scope() as db:
+        keys = (await db.execute(
+            select(Activity.created_at, Activity.id).where(Activity.board_id == board_id)
+            .order_by(Activity.created_at, Activity.id).limit(batch_size)
+        )).all()
+        if keys:
+            await db.execute(delete(Activity).where(
+                Activity.board_id == board_id, tuple_(Activity.created_at, Activity.id) <= tuple_(*keys[-1])
+            ))
+            await db.commit()
+    return len(keys)
+
+
+async def purge_board(board_id, batch_size):
+    """Removes a soft-deleted board bottom-up in batches.
+
+    No transaction deletes more than ``batch_size`` rows, so the purge never
+    holds locks for long, and an interrupted purge resumes where it stopped.
+    """
+    in_board = List.board_id == board_id
+    while await _delete_batch(Task, [Task.list_id.in_(select(List.id).where(in_board))], batch_size) == batch_size:
+        pass
+    while await _delete_batch(List, [in_board], batch_size) == batch_size:
+        pass
+    while await _delete_log_batch(board_id, batch_size) == batch_size:
+        pass
+    while await _delete_activity_batch(board_id, batch_size) == batch_size:
+        pass
+    async with session_scope() as db:
+        await db.execute(delete(Board).where(Board.id == board_id))
+        await db.commit()
+
+
+async def purge_activity(board_id, batch_size):
+    """Removes the activity of a board deleted outright, in batches.
+
+    Runs after the delete has committed. This worker's buffered rows are
+    written first so that they go too.
+    """
+    await activity_log.flush()
+    while await _delete_activity_batch(board_id, batch_size) == batch_size:
+        pass
+
+
+async def purge_deleted_boards(batch_size):
+    async with session_scope() as db:
+        board_ids = (await db.scalars(select(Board.id).where(Board.deleted_at.is_not(None)).order_by(Board.deleted_at))).all()
+    for board_id in board_ids:
+        await purge_board(board_id, batch_size)
+    return len(board_ids)
+
+
+async def run_purge(batch_size, interval_seconds):
+    while True:
+        try:
+            purged = await purge_deleted_boards(batch_size)
+            if purged:
+                logger.info("Purged %d deleted boards", purged)
+        except Exception:
+            logger.exception("Board purge failed")
+        await asyncio.sleep(interval_seconds)
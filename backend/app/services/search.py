@@ -0,0 +1,94 @@
+import re
+from sqlalchemy import Float, and_, cast, column, func, literal, literal_column, null, or_, select, table, tuple_, union_all
+from app.auth.access import membership
+from app.database import engine
+from app.models.board import Board
+from app.models.board_member import BoardMember
+from app.models.list import List
+from app.models.search_index import SEARCH_CONFIG, SEARCHABLE, fts_table
+from app.models.task import Task
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor
+
+
+def _postgres_match(q):
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+
+    def match(statement, model):
+        vector = literal_column(f"{model.__tablename__}.search_vector")
+        # ts_rank_cd returns real; widen it so the rank round-trips through
+        # the cursor unchanged.
+        rank = cast(func.ts_rank_cd(vector, tsquery), Float)
+        return statement.add_columns(rank.label("rank")).where(vector.op("@@")(tsquery))
+    return match
+
+
+def _sqlite_match(q):
+    # Quote every term so user input is never read as FTS5 syntax; the terms
+    # are ANDed like a plain websearch_to_tsquery query.
+    query = " ".join(f'"{term}"' for term in re.findall(r"\w+", q))
+
+    def match(statement, model):
+        name = fts_table(model.__table__)
+        fts = table(name, column("rowid"))
+        columns = SEARCHABLE[model.__table__]
+        weights = [float(len(columns) - index) for index in range(len(columns))]
+        # bm25 is lower-is-better, so negate it to rank like ts_rank_cd.
+        rank = -func.bm25(literal_column(name), *weights)
+        return (
+            statement.add_columns(rank.label("rank"))
+            .join(fts, fts.c.rowid == model.id)
+            .where(literal_column(name).op("MATCH")(query))
+        )
+    return match if query else None
+
+
+def _results(user, match):
+    # Every branch has the same columns so results rank together, and joins
+    # board_members first so only boards the user can reach are searched.
+    return union_all(
+        match(
+            select(literal("board").label("kind"), Board.id, Board.id.label("board_id"), null().label("list_id"),
+                   Board.title, null().label("description"))
+            .join(BoardMember, membership(Board.id, user)),
+            Board,
+        ),
+        match(
+            select(literal("list").label("kind"), List.id, List.board_id, List.id.label("list_id"),
+                   List.title, null().label("description"))
+            .join(BoardMember, membership(List.board_id, user)),
+            List,
+        ),
+        match(
+            select(literal("task").label("kind"), Task.id, List.board_id, Task.list_id, Task.title, Task.description)
+            .join(List).join(BoardMember, membership(List.board_id, user)),
+            Task,
+        ),
+    ).subquery()
+
+
+async def search(db, user, q, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Ranked, keyset-paginated search over board, list and task text.
+
+    Results are ordered by rank, then kind and id; the cursor holds that
+    triple for the last result served.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    match = _sqlite_match(q) if engine.dialect.name == "sqlite" else _postgres_match(q)
+    if match is None:
+        return {"items": [], "next_cursor": None}
+    results = _results(user, match)
+    statement = select(results)
+    if cursor:
+        rank, kind, id_ = decode_cursor(cursor, 3)
+        statement = statement.where(or_(
+            results.c.rank < rank,
+            and_(results.c.rank == rank, tuple_(results.c.kind, results.c.id) > tuple_(kind, id_)),
+        ))
+    rows = (await db.execute(
+        statement.order_by(results.c.rank.desc(), results.c.kind, results.c.id).limit(limit + 1)
+    )).mappings().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor((rows[-1]["rank"], rows[-1]["kind"], rows[-1]["id"]))
+    return {"items": rows, "next_cursor": next_cursor}
@@ -0,0 +1,57 @@
+import asyncio
+import logging
+import time
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from app.auth.access import get_board_for, get_board_version
+from app.auth.hashing import hashing_pool
+from app.database import engine, prefill_pool, replica_engine, session_scope
+from app.models.board import Board
+from app.models.board_member import BoardMember
+from app.models.list import List
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+async def _prime_statements():
+    # Statements are compiled on first use, per engine, and then served from
+    # SQLAlchemy's cache: run the reads behind opening a board, for any one
+    # membership, on each engine.
+    for read_only in (False, True) if replica_engine is not None else (False,):
+        async with session_scope(read_only=read_only) as db:
+            await db.scalar(select(User).where(User.email == ""))
+            member = (await db.execute(select(BoardMember.board_id, BoardMember.user_id).limit(1))).first()
+            board_id, user = (member.board_id, User(id=member.user_id)) if member else (0, User(id=0))
+            try:
+                await get_board_version(db, board_id, user)
+                await get_board_for(db, board_id, user, options=[selectinload(Board.lists).selectinload(List.tasks)])
+            except HTTPException:
+                pass
+
+
+async def warm_up(app, retry_seconds=5):
+    """Prepares the worker for traffic, then marks it ready.
+
+    Fills the connection pools, starts the hashing workers with bcrypt
+    loaded, compiles the statements behind opening a board and builds the
+    OpenAPI schema. A database that is not up yet is retried; until then
+    /ready answers 503.
+    """
+    started = time.perf_counter()
+    while True:
+        try:
+            await asyncio.gather(
+                prefill_pool(engine),
+                *([prefill_pool(replica_engine)] if replica_engine is not None else []),
+                hashing_pool.warm(),
+            )
+            await _prime_statements()
+            break
+        except Exception:
+            logger.exception("Warmup failed, retrying in %ss", retry_seconds)
+            await asyncio.sleep(retry_seconds)
+    app.openapi()
+    app.state.ready = True
+    logger.info("Warmed up in %.2fs", time.perf_counter() - started)
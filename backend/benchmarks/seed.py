@@ -0,0 +1,54 @@
+"""Bulk seeding shared by the load test and the query-plan test, so both
+exercise the same data.
+
+User ``u`` is user{u}@example.com and owns ``boards_per_user`` boards, each
+shared with the next user as an editor, with ``lists_per_board`` lists of
+``tasks_per_list`` tasks. Ids are assigned here, starting at 1, so the
+schema must be empty.
+"""
+from sqlalchemy import insert
+from app.models import Board, BoardMember, List, Task, User
+from app.models.board import board_user_association
+from app.services.ordering import spaced_keys
+
+INSERT_ROWS = 10000
+
+
+def seed_boards(sync_engine, users, boards_per_user, lists_per_board, tasks_per_list, hashed_password=""):
+    """Inserts the dataset, then refreshes sequences and statistics; returns the row counts."""
+    with sync_engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": u, "email": f"user{u}@example.com", "hashed_password": hashed_password, "is_active": True, "is_confirmed": True}
+            for u in range(1, users + 1)
+        ])
+        boards, members, shares = [], [], []
+        for u in range(1, users + 1):
+            for _ in range(boards_per_user):
+                board_id = len(boards) + 1
+                boards.append({"id": board_id, "title": f"Board {board_id}", "background_color": "blue", "owner_id": u})
+                members.append({"board_id": board_id, "user_id": u, "role": "owner"})
+                if users > 1:
+                    guest = u % users + 1
+                    members.append({"board_id": board_id, "user_id": guest, "role": "editor"})
+                    shares.append({"board_id": board_id, "user_id": guest})
+        conn.execute(insert(Board), boards)
+        conn.execute(insert(BoardMember), members)
+        if shares:
+            conn.execute(insert(board_user_association), shares)
+        lists, tasks = [], []
+        list_keys, task_keys = spaced_keys(lists_per_board), spaced_keys(tasks_per_list)
+        for board in boards:
+            for position in list_keys:
+                list_id = len(lists) + 1
+                lists.append({"id": list_id, "title": f"List {list_id}", "board_id": board["id"], "position": position})
+                for task_position in task_keys:
+                    tasks.append({"title": f"Task {len(tasks) + 1}", "description": "", "list_id": list_id, "position": task_position})
+        conn.execute(insert(List), lists)
+        for start in range(0, len(tasks), INSERT_ROWS):
+            conn.execute(insert(Task), tasks[start:start + INSERT_ROWS])
+        if sync_engine.dialect.name == "postgresql":
+            for table in ("users", "boards", "lists", "tasks"):
+                conn.exec_driver_sql(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))")
+    with sync_engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    return {"users": users, "boards": len(boards), "lists": len(lists), "tasks": len(tasks)}
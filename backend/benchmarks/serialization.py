@@ -0,0 +1,74 @@
+"""Serialization cost of a task list, before and after typed response models.
+
+"before" is what FastAPI did for routes that returned ORM objects without a
+response_model: jsonable_encoder walks every instance by reflection and
+JSONResponse renders the result with the stdlib json module. "after" is the
+current path: pydantic validates the objects against TaskResponse and
+ORJSONResponse renders the result.
+
+    python benchmarks/serialization.py [--tasks 1000] [--repeat 50]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.models import Task
+from app.schemas.task import TaskResponse
+
+tasks_adapter = TypeAdapter(list[TaskResponse])
+
+
+def before(tasks):
+    return JSONResponse(jsonable_encoder(tasks)).body
+
+
+def pydantic_stdlib_json(tasks):
+    return JSONResponse(tasks_adapter.dump_python(tasks_adapter.validate_python(tasks, from_attributes=True), mode="json")).body
+
+
+def after(tasks):
+    return ORJSONResponse(tasks_adapter.dump_python(tasks_adapter.validate_python(tasks, from_attributes=True), mode="json")).body
+
+
+def measure(fn, tasks, repeat):
+    fn(tasks)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(tasks)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    tasks = [
+        Task(id=i, title=f"Task {i}", description="Lorem ipsum dolor sit amet " * 4, list_id=i // 50 + 1, position=f"i{i:05d}")
+        for i in range(1, args.tasks + 1)
+    ]
+    baseline = measure(before, tasks, args.repeat)
+    print(f"{'path':<40}{'ms/1000 tasks':>15}{'speedup':>10}")
+    for name, fn in (
+        ("jsonable_encoder + JSONResponse", before),
+        ("response_model + JSONResponse", pydantic_stdlib_json),
+        ("response_model + ORJSONResponse", after),
+    ):
+        elapsed = baseline if fn is before else measure(fn, tasks, args.repeat)
+        print(f"{name:<40}{elapsed * 1000 * 1000 / args.tasks:>15.2f}{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 # Main application file for the Brello backend
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, Boolean
 from sqlalchemy.ext.declarative import declarative_base
@@ -127,10 +129,14 @@ class TaskResponse(BaseModel):
     description: str | None
     todo_list_id: int
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Create tables when the app starts rather than when the module is imported
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(Base.metadata.create_all, bind=engine)
+    yield
+    engine.dispose()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Disable CORS. Do not remove this for full-stack development.
 app.add_middleware(
@@ -0,0 +1,89 @@
+"""Test settings and database fixtures.
+
+The app reads its settings once, at import, so they are set here before any
+test imports it. Tests run against a scratch SQLite file unless
+TEST_DATABASE_URL names a Postgres database; tests that need Postgres skip
+without one. The test database is dropped and recreated for every test, so
+never point it at real data.
+"""
+import os
+import socket
+import tempfile
+import pytest
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+os.environ.update(
+    DATABASE_URL=os.getenv("TEST_DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"),
+    DATABASE_REPLICA_URL="",
+    STARTUP_WARMUP="false",
+    # Every test signs up from the same client address.
+    SIGNUP_RATE_LIMIT_IP_BURST="1000",
+)
+os.environ.setdefault("JWT_SECRET_KEY", "test")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def hashing_workers():
+    from app.auth.hashing import hashing_pool
+
+    yield hashing_pool
+    hashing_pool.shutdown()
+
+
+def create_user(sync_engine, email):
+    """Adds a confirmed user and returns the headers that authenticate as them."""
+    from sqlalchemy import insert
+    from app.auth.jwt import create_access_token
+    from app.models import User
+
+    with sync_engine.begin() as conn:
+        conn.execute(insert(User).values(email=email, hashed_password="", is_active=True, is_confirmed=True))
+    return {"Authorization": "Bearer " + create_access_token({"sub": email})}
+
+
+@pytest.fixture
+async def database():
+    """An empty schema built from the models; the pools are closed afterwards."""
+    from sqlalchemy import create_engine
+    from app.auth.principal_cache import principal_cache
+    from app.config import settings
+    from app.database import Base, dispose_engines
+    from app.services.board_cache import MemoryBackend, board_cache
+    import app.models
+
+    sync_engine = create_engine(os.environ["DATABASE_URL"])
+    Base.metadata.drop_all(sync_engine)
+    Base.metadata.create_all(sync_engine)
+    # Ids start over with the schema, so nothing cached by id may survive it.
+    principal_cache.clear()
+    board_cache.backend = MemoryBackend(settings.BOARD_CACHE_MAX_BYTES)
+    yield sync_engine
+    sync_engine.dispose()
+    await dispose_engines()
+
+
+@pytest.fixture
+async def client(database):
+    import httpx
+    from app.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def postgres(database):
+    if database.dialect.name != "postgresql":
+        pytest.skip("needs TEST_DATABASE_URL pointing at Postgres")
+    return database
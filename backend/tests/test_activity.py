@@ -0,0 +1,40 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import func, insert, select, text
+from app.database import session_scope
+from app.models.activity import Activity
+from app.services.activity import drop_expired_partitions, ensure_partitions
+
+pytestmark = pytest.mark.anyio
+
+
+async def partitions():
+    async with session_scope() as db:
+        return sorted((await db.scalars(text(
+            "SELECT child.relname FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = 'activity'::regclass"
+        ))).all())
+
+
+async def test_expired_partitions_are_dropped(postgres):
+    now = datetime(2026, 10, 18)
+    await ensure_partitions(datetime(2025, 8, 1), months_ahead=14)
+    async with session_scope() as db:
+        await db.execute(insert(Activity), [
+            {"created_at": created_at, "board_id": 1, "type": "list.created", "data": {}}
+            for created_at in (datetime(2025, 8, 31), datetime(2025, 10, 1), now)
+        ])
+        await db.commit()
+
+    assert await drop_expired_partitions(12, now) == ["activity_y2025m08", "activity_y2025m09"]
+    assert "activity_y2025m09" not in await partitions()
+    assert {"activity_default", "activity_y2025m10", "activity_y2026m10"} <= set(await partitions())
+    async with session_scope() as db:
+        assert await db.scalar(select(func.count()).select_from(Activity)) == 2
+    assert await drop_expired_partitions(12, now) == []
+
+
+async def test_retention_of_zero_keeps_everything(postgres):
+    await ensure_partitions(datetime(2020, 1, 1))
+    assert await drop_expired_partitions(0) == []
+    assert "activity_y2020m01" in await partitions()
@@ -0,0 +1,60 @@
+import orjson
+import pytest
+from sqlalchemy import func, select
+from app.models import Board, List, Task
+from tests.conftest import create_user
+
+pytestmark = pytest.mark.anyio
+
+BOARD = {"type": "board", "id": 7, "title": "Imported", "background_color": "blue"}
+LIST = {"type": "list", "id": 8, "board_id": 7, "title": "To do", "position": "i"}
+TASK = {"type": "task", "id": 9, "list_id": 8, "title": "Write", "description": None, "position": "i"}
+
+
+def ndjson(*records):
+    return b"".join(orjson.dumps(record) + b"\n" for record in records)
+
+
+async def test_export_imports_back(database, client):
+    headers = create_user(database, "ann@example.com")
+    board = (await client.post("/boards/", params={"title": "Source", "background_color": "red"}, headers=headers)).json()
+    lists = [(await client.post(f"/lists/{board['id']}", params={"title": title}, headers=headers)).json() for title in ("A", "B")]
+    for title in ("one", "two"):
+        (await client.post(f"/tasks/{lists[0]['id']}", params={"title": title, "description": ""}, headers=headers)).raise_for_status()
+
+    export = (await client.get(f"/boards/{board['id']}/export", headers=headers)).content
+    response = await client.post("/boards/import", content=export, headers=headers)
+    assert response.status_code == 200
+    imported = response.json()
+    assert (imported["boards"], imported["lists"], imported["tasks"]) == (1, 2, 2)
+
+    copy = imported["board_ids"][0]
+    copied_lists = (await client.get(f"/lists/{copy}", headers=headers)).json()["items"]
+    assert [item["title"] for item in copied_lists] == ["A", "B"]
+    tasks = (await client.get(f"/tasks/{copied_lists[0]['id']}", headers=headers)).json()["items"]
+    assert [task["title"] for task in tasks] == ["one", "two"]
+    # Imported positions can be placed around.
+    response = await client.put(f"/tasks/{tasks[1]['id']}/move", params={"new_list_id": copied_lists[0]["id"], "before_id": tasks[0]["id"]}, headers=headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("records", [
+    [BOARD, {**LIST, "position": ""}],
+    [BOARD, {**LIST, "position": "0"}],
+    [BOARD, {**LIST, "position": "a0"}],
+    [BOARD, {**LIST, "position": "!"}],
+    [BOARD, {**LIST, "position": "A"}],
+    [BOARD, {**LIST, "position": 5}],
+    [BOARD, LIST, {**TASK, "position": None}],
+    [{**BOARD, "title": 3}],
+    [BOARD, {key: value for key, value in LIST.items() if key != "title"}],
+    [BOARD, LIST, {**TASK, "title": ["Write"]}],
+    [BOARD, LIST, {**TASK, "description": {}}],
+])
+async def test_invalid_records_reject_the_file(database, client, records):
+    headers = create_user(database, "ann@example.com")
+    response = await client.post("/boards/import", content=ndjson({"type": "export", "format": 1}, *records), headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith(f"Line {len(records) + 1}:")
+    with database.connect() as conn:
+        assert [conn.scalar(select(func.count()).select_from(model)) for model in (Board, List, Task)] == [0, 0, 0]
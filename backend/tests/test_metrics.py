@@ -0,0 +1,18 @@
+import pytest
+from sqlalchemy import text
+from app.database import dispose_engines, session_scope
+from app.services.metrics import registry
+
+pytestmark = pytest.mark.anyio
+
+
+def pool_checked_out():
+    return [line for line in registry.render().splitlines() if line.startswith("db_pool_primary_checked_out ")]
+
+
+async def test_pool_stats_follow_a_disposed_engine(postgres):
+    await dispose_engines()
+    async with session_scope() as db:
+        await db.execute(text("SELECT 1"))
+        assert pool_checked_out() == ["db_pool_primary_checked_out 1"]
+    assert pool_checked_out() == ["db_pool_primary_checked_out 0"]
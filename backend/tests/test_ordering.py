@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import select
+from app.models import Task
+from app.services.activity import activity_log
+from app.services.ordering import is_valid_key, key_between, rebalance, spaced_keys
+from tests.conftest import create_user
+
+pytestmark = pytest.mark.anyio
+
+
+def test_keys_sort_between_their_neighbours():
+    keys = spaced_keys(3)
+    assert keys == sorted(keys) and all(map(is_valid_key, keys))
+    for a, b in [(None, keys[0]), (keys[0], keys[1]), (keys[2], None), ("i", "i1"), ("hzzz", "i")]:
+        key = key_between(a, b)
+        assert is_valid_key(key)
+        assert (a is None or a < key) and (b is None or key < b)
+
+
+@pytest.mark.parametrize("key", ["", "0", "a0", "!", "A", None, 5])
+def test_invalid_keys(key):
+    assert not is_valid_key(key)
+
+
+async def test_rebalance_records_a_compact_system_event(database, client):
+    headers = create_user(database, "ann@example.com")
+    board = (await client.post("/boards/", params={"title": "Board", "background_color": "blue"}, headers=headers)).json()
+    todo = (await client.post(f"/lists/{board['id']}", params={"title": "To do"}, headers=headers)).json()
+    for title in ("one", "two", "three"):
+        (await client.post(f"/tasks/{todo['id']}", params={"title": title, "description": ""}, headers=headers)).raise_for_status()
+    await activity_log.flush()
+    recorded = activity_log.recorded
+
+    await rebalance(Task, Task.list_id, todo["id"], board["id"])
+
+    with database.connect() as conn:
+        assert conn.scalars(select(Task.position).where(Task.list_id == todo["id"]).order_by(Task.position)).all() == spaced_keys(3)
+    changes = (await client.get(f"/boards/{board['id']}/changes", params={"since": 0}, headers=headers)).json()
+    assert changes["changes"][-1]["type"] == "list.rebalanced"
+    assert changes["changes"][-1]["data"] == {"list_id": todo["id"]}
+    assert activity_log.recorded == recorded
@@ -0,0 +1,111 @@
+"""End-to-end test of the email outbox against a local aiosmtpd stand-in.
+
+Signs users up through the API, which queues the confirmation mails, then
+drains the outbox with the sender into an in-process aiosmtpd server that
+rejects one mailbox permanently and another once with a transient error.
+"""
+from datetime import datetime
+import httpx
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import func, select, update
+
+from app.config import settings
+from app.database import session_scope
+from app.main import app
+from app.models.outbox import OutboxMessage
+from app.services.outbox import enqueue_email, process_batch, smtp_pool
+from tests.conftest import free_port
+
+pytestmark = pytest.mark.anyio
+
+SIGNUPS = 20
+CONNECTIONS = 2
+BATCH_SIZE = 8
+
+
+class Recorder:
+    """aiosmtpd handler that counts sessions and can refuse recipients."""
+
+    def __init__(self):
+        self.sessions = 0
+        self.delivered = []
+        self.deferred = set()
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == "bounce@example.com":
+            return "550 No such mailbox"
+        if address == "flaky@example.com" and address not in self.deferred:
+            self.deferred.add(address)
+            return "451 Try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.delivered.extend(envelope.rcpt_tos)
+        return "250 Message accepted"
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    recorder = Recorder()
+    controller = Controller(recorder, hostname="127.0.0.1", port=free_port())
+    for name, value in {
+        "MAIL_SERVER": "127.0.0.1", "MAIL_PORT": controller.port, "MAIL_USERNAME": "", "MAIL_PASSWORD": "",
+        "MAIL_STARTTLS": False, "MAIL_SSL_TLS": False, "OUTBOX_SMTP_CONNECTIONS": CONNECTIONS,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+    controller.start()
+    yield recorder
+    controller.stop()
+
+
+async def drain(pool):
+    for _ in range(2):
+        while await process_batch(pool, BATCH_SIZE, max_attempts=3):
+            pass
+        # Make the deferred message due again instead of waiting out its backoff.
+        async with session_scope() as db:
+            await db.execute(update(OutboxMessage).where(OutboxMessage.status == "pending").values(next_attempt_at=datetime.utcnow()))
+            await db.commit()
+
+
+async def outbox_statuses():
+    async with session_scope() as db:
+        return dict((await db.execute(
+            select(OutboxMessage.status, func.count()).group_by(OutboxMessage.status)
+        )).all())
+
+
+async def test_signup_queues_confirmation_mail(database, smtp_server):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/auth/signup", params={"email": "new@example.com", "password": "secret"})
+    assert response.status_code == 200
+    assert smtp_server.sessions == 0
+    assert await outbox_statuses() == {"pending": 1}
+
+
+async def test_sender_delivers_and_retries(database, smtp_server):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        for index in range(SIGNUPS):
+            response = await client.post("/auth/signup", params={"email": f"user{index}@example.com", "password": "secret"})
+            assert response.status_code == 200
+    async with session_scope() as db:
+        for recipient in ("bounce@example.com", "flaky@example.com"):
+            enqueue_email(db, recipient, "Check", "<p>Check</p>")
+        await db.commit()
+
+    pool = smtp_pool()
+    try:
+        await drain(pool)
+    finally:
+        await pool.close()
+
+    assert await outbox_statuses() == {"sent": SIGNUPS + 1, "failed": 1}
+    assert sorted(smtp_server.delivered) == sorted([f"user{index}@example.com" for index in range(SIGNUPS)] + ["flaky@example.com"])
+    assert pool.connects <= CONNECTIONS
@@ -0,0 +1,53 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+from app.auth.rate_limit import AuthRateLimiter, MemoryBackend, RateLimit
+
+pytestmark = pytest.mark.anyio
+
+
+def request_from(host):
+    return Request({"type": "http", "headers": [], "client": (host, 1234)})
+
+
+def limiter(ip_burst=10, email_burst=2):
+    return AuthRateLimiter("login", MemoryBackend(), by_ip=RateLimit(ip_burst, 1), by_email=RateLimit(email_burst, 1))
+
+
+async def test_successful_attempts_leave_the_email_bucket_alone():
+    login = limiter()
+    for host in range(5):
+        await login.check(request_from(f"10.0.0.{host}"), "ann@example.com")
+    assert login.stats() == {"allowed": 5, "rejected": 0, "failures": 0}
+
+
+async def test_failed_attempts_lock_the_email():
+    login = limiter()
+    for _ in range(2):
+        await login.check(request_from("10.0.0.1"), "Ann@example.com ")
+        await login.failed("ann@example.com")
+    with pytest.raises(HTTPException) as rejected:
+        await login.check(request_from("10.0.0.2"), "ann@example.com")
+    assert rejected.value.status_code == 429
+    assert int(rejected.value.headers["Retry-After"]) > 0
+    await login.check(request_from("10.0.0.2"), "bob@example.com")
+
+
+async def test_email_rejection_spends_no_ip_token():
+    login = limiter(ip_burst=1)
+    await login.failed("ann@example.com")
+    await login.failed("ann@example.com")
+    for _ in range(3):
+        with pytest.raises(HTTPException):
+            await login.check(request_from("10.0.0.1"), "ann@example.com")
+    await login.check(request_from("10.0.0.1"), "bob@example.com")
+    with pytest.raises(HTTPException):
+        await login.check(request_from("10.0.0.1"), "bob@example.com")
+
+
+async def test_wrong_password_is_charged_to_the_email(client):
+    for _ in range(5):
+        response = await client.post("/auth/token", data={"username": "ann@example.com", "password": "wrong"})
+        assert response.status_code == 401
+    response = await client.post("/auth/token", data={"username": "ann@example.com", "password": "wrong"})
+    assert response.status_code == 429
@@ -0,0 +1,151 @@
+"""Read/write splitting between the primary and a read replica.
+
+The "replica" is a second database that is replicated by copying the primary
+over it at chosen points. Between copies it is stale, which shows where each
+request was served from.
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.engine import make_url
+import app.database
+from app.config import settings
+from app.database import RecentWriters, make_engine
+from app.models import User
+from tests.conftest import create_user
+
+pytestmark = pytest.mark.anyio
+
+WINDOW_SECONDS = 0.5
+WRITES = ("INSERT", "UPDATE", "DELETE")
+
+
+@pytest.fixture(scope="module")
+def replica_url():
+    primary = make_url(os.environ["DATABASE_URL"])
+    if primary.get_backend_name() == "sqlite":
+        return f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'replica.db')}"
+    return primary.set(database=primary.database + "_replica").render_as_string(hide_password=False)
+
+
+@pytest.fixture(scope="module")
+def replica_engine(replica_url):
+    return make_engine(
+        replica_url, "replica",
+        settings.DATABASE_REPLICA_POOL_SIZE, settings.DATABASE_REPLICA_MAX_OVERFLOW, settings.DATABASE_REPLICA_STATEMENT_TIMEOUT_MS,
+    )
+
+
+async def dispose(target):
+    result = target.dispose()
+    if asyncio.iscoroutine(result):
+        await result
+
+
+class Replica:
+    def __init__(self, primary, url, engine):
+        self.primary = primary
+        self.primary_url = primary.url
+        self.url = make_url(url)
+        self.engine = engine
+        self.statements = {"primary": [], "replica": []}
+
+    async def replicate(self):
+        """Makes the replica an up-to-date copy of the primary."""
+        # Postgres copies a database only while nobody is connected to it.
+        self.primary.dispose()
+        await dispose(app.database.engine)
+        await dispose(self.engine)
+        if self.primary_url.get_backend_name() == "sqlite":
+            shutil.copyfile(self.primary_url.database, self.url.database)
+            return
+        import psycopg
+
+        maintenance = self.primary_url.set(drivername="postgresql", database="postgres")
+        with psycopg.connect(maintenance.render_as_string(hide_password=False), autocommit=True) as conn:
+            conn.execute(f'DROP DATABASE IF EXISTS "{self.url.database}" WITH (FORCE)')
+            conn.execute(f'CREATE DATABASE "{self.url.database}" TEMPLATE "{self.primary_url.database}"')
+
+    def writes(self, name):
+        return [operation for operation in self.statements[name] if operation in WRITES]
+
+
+@pytest.fixture
+async def replica(database, replica_url, replica_engine, monkeypatch):
+    monkeypatch.setattr(app.database, "replica_engine", replica_engine)
+    monkeypatch.setattr(app.database, "recent_writers", RecentWriters(WINDOW_SECONDS))
+    replica = Replica(database, replica_url, replica_engine)
+    listeners = []
+    for name, target in (("primary", app.database.engine), ("replica", replica_engine)):
+        def record(conn, cursor, statement, *args, name=name):
+            replica.statements[name].append(statement.lstrip().split(None, 1)[0].upper())
+        sync_engine = getattr(target, "sync_engine", target)
+        event.listen(sync_engine, "before_cursor_execute", record)
+        listeners.append((sync_engine, record))
+    yield replica
+    for sync_engine, record in listeners:
+        event.remove(sync_engine, "before_cursor_execute", record)
+    await dispose(replica_engine)
+
+
+async def titles(client, headers):
+    response = await client.get("/boards/", headers=headers)
+    assert response.status_code == 200
+    return [board["title"] for board in response.json()["items"]]
+
+
+async def create_board(client, headers):
+    response = await client.post("/boards/", params={"title": "Fresh", "background_color": "blue"}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_reads_are_served_by_the_replica(database, client, replica):
+    writer, reader = create_user(database, "writer@example.com"), create_user(database, "reader@example.com")
+    await replica.replicate()
+    board = await create_board(client, writer)
+    response = await client.post(f"/boards/{board['id']}/share", params={"email": "reader@example.com"}, headers=writer)
+    assert response.status_code == 200
+
+    replica.statements["replica"].clear()
+    assert await titles(client, reader) == []
+    assert "SELECT" in replica.statements["replica"]
+    await replica.replicate()
+    assert await titles(client, reader) == ["Fresh"]
+
+
+async def test_writes_go_to_the_primary(database, client, replica):
+    writer = create_user(database, "writer@example.com")
+    await replica.replicate()
+    board = await create_board(client, writer)
+    response = await client.put(f"/boards/{board['id']}", params={"title": "Renamed", "background_color": "red"}, headers=writer)
+    assert response.status_code == 200
+    response = await client.delete(f"/boards/{board['id']}", headers=writer)
+    assert response.status_code == 200
+
+    assert {"INSERT", "UPDATE", "DELETE"} <= set(replica.writes("primary"))
+    assert replica.writes("replica") == []
+
+
+async def test_writer_reads_its_writes_within_the_window(database, client, replica):
+    writer = create_user(database, "writer@example.com")
+    await replica.replicate()
+    await create_board(client, writer)
+
+    assert await titles(client, writer) == ["Fresh"]
+    await asyncio.sleep(WINDOW_SECONDS * 1.5)
+    assert await titles(client, writer) == []
+
+
+async def test_confirm_email_uses_the_primary(database, client, replica):
+    await replica.replicate()
+    # An emailed link is a GET that writes: it must find a user the replica has not seen yet.
+    with database.begin() as conn:
+        conn.execute(insert(User).values(email="new@example.com", hashed_password="", is_active=True, is_confirmed=False, confirmation_token="link"))
+
+    response = await client.get("/auth/confirm-email", params={"token": "link"})
+    assert response.status_code == 200
+    assert replica.writes("replica") == []
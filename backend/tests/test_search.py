@@ -0,0 +1,115 @@
+import pytest
+from sqlalchemy import select
+from app.models import Board
+from app.config import settings
+from tests.conftest import create_user
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def ann(database):
+    return create_user(database, "ann@example.com")
+
+
+async def make_board(client, headers, title="Board"):
+    response = await client.post("/boards/", params={"title": title, "background_color": "blue"}, headers=headers)
+    assert response.status_code == 200
+    board = response.json()
+    response = await client.post(f"/lists/{board['id']}", params={"title": "To do"}, headers=headers)
+    assert response.status_code == 200
+    return board, response.json()
+
+
+async def make_task(client, headers, list_id, title, description=""):
+    response = await client.post(f"/tasks/{list_id}", params={"title": title, "description": description}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+async def search(client, headers, q, **params):
+    response = await client.get("/search", params={"q": q, **params}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+async def hits(client, headers, q):
+    return [(item["kind"], item["id"]) for item in (await search(client, headers, q))["items"]]
+
+
+async def test_terms_match_titles_and_descriptions(client, ann):
+    board, todo = await make_board(client, ann, "Rocket launch")
+    engine = await make_task(client, ann, todo["id"], "Test engines", "Static fire before the launch")
+    await make_task(client, ann, todo["id"], "Order pizza")
+
+    assert set(await hits(client, ann, "launch")) == {("board", board["id"]), ("task", engine["id"])}
+    # Terms are stemmed and all of them must match.
+    assert await hits(client, ann, "engine fires") == [("task", engine["id"])]
+    assert await hits(client, ann, "launch pizza") == []
+    # Query syntax in the input is matched as plain words.
+    assert await hits(client, ann, 'pizza" OR "launch') == []
+
+
+async def test_results_are_ranked(client, ann):
+    _, todo = await make_board(client, ann)
+    in_description = await make_task(client, ann, todo["id"], "Chores", "walk the dog")
+    in_title = await make_task(client, ann, todo["id"], "Dog grooming")
+
+    results = (await search(client, ann, "dog"))["items"]
+    assert [item["id"] for item in results] == [in_title["id"], in_description["id"]]
+    assert results[0]["rank"] > results[1]["rank"]
+
+
+async def test_cursor_pages_through_every_result(client, ann):
+    _, todo = await make_board(client, ann)
+    tasks = [await make_task(client, ann, todo["id"], f"Invoice {index}", "invoice " * (index % 3)) for index in range(7)]
+
+    seen, cursor = [], None
+    while True:
+        page = await search(client, ann, "invoice", limit=3, **({"cursor": cursor} if cursor else {}))
+        assert len(page["items"]) <= 3
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(task["id"] for task in tasks)
+    assert len(seen) == len(set(seen))
+    # Pages continue the single ranked order.
+    assert seen == [item["id"] for item in (await search(client, ann, "invoice", limit=10))["items"]]
+
+
+async def test_index_follows_edits_and_deletes(client, ann):
+    _, todo = await make_board(client, ann)
+    task = await make_task(client, ann, todo["id"], "Buy paint")
+
+    response = await client.put(f"/tasks/{task['id']}", params={"title": "Buy brushes", "description": "for the fence"}, headers=ann)
+    assert response.status_code == 200
+    assert await hits(client, ann, "paint") == []
+    assert await hits(client, ann, "brushes fence") == [("task", task["id"])]
+
+    response = await client.delete(f"/tasks/{task['id']}", headers=ann)
+    assert response.status_code == 200
+    assert await hits(client, ann, "brushes") == []
+
+
+async def test_only_boards_the_user_belongs_to(client, database, ann):
+    bob = create_user(database, "bob@example.com")
+    board, todo = await make_board(client, bob, "Secret plans")
+    await make_task(client, bob, todo["id"], "Secret task")
+    assert await hits(client, ann, "secret") == []
+
+    response = await client.post(f"/boards/{board['id']}/share", params={"email": "ann@example.com"}, headers=bob)
+    assert response.status_code == 200
+    assert len(await hits(client, ann, "secret")) == 2
+
+
+async def test_soft_deleted_boards_are_not_searched(client, database, ann, monkeypatch):
+    monkeypatch.setattr(settings, "BOARD_SOFT_DELETE_THRESHOLD", 0)
+    board, todo = await make_board(client, ann, "Archive")
+    await make_task(client, ann, todo["id"], "Archive task")
+
+    response = await client.delete(f"/boards/{board['id']}", headers=ann)
+    assert response.status_code == 200
+    with database.connect() as conn:
+        assert conn.scalar(select(Board.deleted_at).where(Board.id == board["id"])) is not None
+    assert await hits(client, ann, "archive") == []